@@ -0,0 +1,85 @@
+"""
+Micro-benchmark for per-node memory: allocations and bytes per thousand nodes,
+for the slotted node classes and for dict-backed equivalents (the layout the
+classes had before __slots__).
+
+Usage: python3 bench/bench_nodes.py [--count N] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from textnode import TextNode, TextType
+from htmlnode import LeafNode, ParentNode
+
+# Subclasses without __slots__ get a per-instance __dict__ again.
+class DictTextNode(TextNode):
+    pass
+
+class DictLeafNode(LeafNode):
+    pass
+
+class DictParentNode(ParentNode):
+    pass
+
+def make_text_nodes(text_node_class, labels):
+    return [text_node_class(label, TextType.PLAIN) for label in labels]
+
+def make_html_nodes(leaf_class, parent_class, labels):
+    # One paragraph per ten leaves, roughly the shape markdown_to_html_node produces.
+    leaves = [leaf_class("b", label) for label in labels]
+    return [parent_class("p", leaves[i:i + 10]) for i in range(0, len(leaves), 10)]
+
+def measure(factory, count):
+    # Strings are built before tracing starts so that only node overhead is counted.
+    labels = [f"word {i}" for i in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    nodes = factory(labels)
+    elapsed = time.perf_counter() - start
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = [stat for stat in after.compare_to(before, "filename") if stat.size_diff > 0]
+    allocations = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    del nodes, labels
+    per_thousand = 1000 / count
+    return {
+        "allocations_per_1000": round(allocations * per_thousand),
+        "bytes_per_1000": round(size * per_thousand),
+        "seconds_per_1000": elapsed * per_thousand,
+    }
+
+def run(count):
+    cases = {
+        "TextNode (dict)": lambda n: make_text_nodes(DictTextNode, n),
+        "TextNode (slots)": lambda n: make_text_nodes(TextNode, n),
+        "HTMLNode tree (dict)": lambda n: make_html_nodes(DictLeafNode, DictParentNode, n),
+        "HTMLNode tree (slots)": lambda n: make_html_nodes(LeafNode, ParentNode, n),
+    }
+    return {name: measure(factory, count) for name, factory in cases.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000, help="Nodes to create per case.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.count)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'case':<24}{'allocs/1000':>14}{'bytes/1000':>14}{'ms/1000':>10}")
+    for name, result in results.items():
+        print(f"{name:<24}{result['allocations_per_1000']:>14}{result['bytes_per_1000']:>14}{result['seconds_per_1000'] * 1000:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Benchmark suite for the markdown-to-HTML pipeline.
+
+Generates synthetic corpora and times each stage separately:
+markdown_to_blocks, block_to_block_type, text_to_textnodes (both inline parsers),
+text_node_to_html_node, to_html, and a full generate_pages_in_dir build.
+Results are written as JSON; pass --compare to check them against an earlier run.
+
+Usage: python3 bench/bench_pipeline.py [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from blocks import BlockType, markdown_to_blocks, block_to_block_type
+from markdown_to_html_node import markdown_to_html_node, INLINE_PARSERS
+from text_node_to_html_node import text_node_to_html_node
+from main import generate_pages_in_dir
+
+WORDS = ("the", "ring", "of", "power", "elves", "valar", "shire", "road", "goes", "ever", "on", "and", "hobbit", "tale")
+
+def words(rng, count) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+def inline_text(rng, count) -> str:
+    # Plain words with bold, italic, code, links and images mixed in.
+    pieces = []
+    for i in range(count):
+        match i % 8:
+            case 1:
+                pieces.append(f"**{words(rng, 2)}**")
+            case 3:
+                pieces.append(f"_{words(rng, 2)}_")
+            case 5:
+                pieces.append(f"`{words(rng, 1)}`")
+            case 6:
+                pieces.append(f"[{words(rng, 2)}](/blog/{rng.choice(WORDS)})")
+            case _:
+                pieces.append(words(rng, 5))
+    return " ".join(pieces)
+
+def corpus_long_paragraphs(rng) -> str:
+    return "# Long paragraphs\n\n" + "\n\n".join(inline_text(rng, 400) for _ in range(20))
+
+def corpus_deep_lists(rng) -> str:
+    lists = []
+    for _ in range(20):
+        lists.append("\n".join(f"- {inline_text(rng, 4)}" for _ in range(300)))
+    return "# Lists\n\n" + "\n\n".join(lists)
+
+def corpus_mixed_lists(rng) -> str:
+    lists = []
+    for _ in range(10):
+        lists.append("\n".join(f"- {inline_text(rng, 4)}" for _ in range(300)))
+        lists.append("\n".join(f"{i}. {inline_text(rng, 4)}" for i in range(1, 301)))
+    return "# Lists\n\n" + "\n\n".join(lists)
+
+def corpus_many_links(rng) -> str:
+    lines = []
+    for i in range(2000):
+        if i % 2 == 0:
+            lines.append(f"See [{words(rng, 3)}](https://example.com/{i}) and ![{words(rng, 2)}](/images/{i}.png)")
+        else:
+            lines.append(f"Then [{words(rng, 1)}](/blog/{i}) again")
+    return "# Links\n\n" + "\n\n".join(lines)
+
+def corpus_huge_code(rng) -> str:
+    blocks = []
+    for _ in range(10):
+        code = "\n".join(f"    call_{rng.choice(WORDS)}({i}) * 2" for i in range(5000))
+        blocks.append(f"```\n{code}\n```")
+    return "# Code\n\n" + "\n\n".join(blocks)
+
+CORPORA = {
+    "long_paragraphs": corpus_long_paragraphs,
+    "deep_lists": corpus_deep_lists,
+    "many_links": corpus_many_links,
+    "huge_code": corpus_huge_code,
+}
+
+# --compare matches results by corpus name, so a corpus's content must never change;
+# new content gets a new name. Corpora added since the first results each draw from
+# their own generator, so the corpora above (and small_pages) keep their content.
+ADDED_CORPORA = {
+    "mixed_lists": corpus_mixed_lists,
+}
+
+def block_text(block: str, block_type: BlockType) -> list:
+    # The inline markdown of a block, split the way markdown_to_html_node splits it.
+    match block_type:
+        case BlockType.PARAGRAPH:
+            return [block.replace("\n", " ")]
+        case BlockType.HEADING:
+            return [block.lstrip("#").strip()]
+        case BlockType.UNORDERED_LIST | BlockType.ORDERED_LIST:
+            return [line.split(" ", 1)[1] for line in block.split("\n") if " " in line]
+        case _:
+            return []
+
+def best_of(repeat, function):
+    """
+    Runs function repeat times and returns (minimum seconds, mean seconds, last result).
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), sum(times) / len(times), result
+
+def bench_corpus(markdown: str, repeat: int) -> dict:
+    stages = {}
+
+    def record(name, function):
+        best, mean, result = best_of(repeat, function)
+        stages[name] = {"min": best, "mean": mean}
+        return result
+
+    blocks = record("markdown_to_blocks", lambda: markdown_to_blocks(markdown))
+    block_types = record("block_to_block_type", lambda: [block_to_block_type(block) for block in blocks])
+    texts = [text for block, block_type in zip(blocks, block_types) for text in block_text(block, block_type)]
+
+    text_nodes = None
+    for name, parser in sorted(INLINE_PARSERS.items()):
+        nodes = record(f"text_to_textnodes[{name}]", lambda: [parser(text) for text in texts])
+        if name == "split":
+            text_nodes = nodes
+
+    record("text_node_to_html_node", lambda: [[text_node_to_html_node(node) for node in line] for line in text_nodes])
+    tree = markdown_to_html_node(markdown)
+    record("to_html", tree.to_html)
+    record("markdown_to_html_node", lambda: markdown_to_html_node(markdown))
+    return {"bytes": len(markdown.encode()), "blocks": len(blocks), "stages": stages}
+
+def bench_site(rng, pages: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        content = os.path.join(temp_dir, "content")
+        for i in range(pages):
+            page_dir = os.path.join(content, f"section{i % 20}", f"page{i}")
+            os.makedirs(page_dir)
+            with open(os.path.join(page_dir, "index.md"), "w") as page_file:
+                page_file.write(f"# Page {i}\n\n{inline_text(rng, 30)}\n\n- {words(rng, 4)}\n- {words(rng, 4)}\n")
+        template_path = os.path.join(temp_dir, "template.html")
+        with open(template_path, "w") as template_file:
+            template_file.write('<html><head><title>{{ Title }}</title><link href="/index.css" /></head><body>{{ Content }}</body></html>')
+        docs = os.path.join(temp_dir, "docs")
+
+        def build():
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_pages_in_dir("/", content, template_path, docs)
+
+        best, mean, _ = best_of(repeat, build)
+    return {"pages": pages, "stages": {"generate_pages_in_dir": {"min": best, "mean": mean}}}
+
+def run(repeat: int, pages: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    results = {}
+    for name, make_corpus in CORPORA.items():
+        print(f"Benchmarking {name}...", file=sys.stderr)
+        results[name] = bench_corpus(make_corpus(rng), repeat)
+    for name, make_corpus in ADDED_CORPORA.items():
+        print(f"Benchmarking {name}...", file=sys.stderr)
+        results[name] = bench_corpus(make_corpus(random.Random(f"{seed}/{name}")), repeat)
+    print(f"Benchmarking small_pages ({pages} pages)...", file=sys.stderr)
+    results["small_pages"] = bench_site(rng, pages, repeat)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "corpora": results,
+    }
+
+# Stages this fast are dominated by timer noise, so small absolute changes are ignored.
+MIN_REGRESSION_SECONDS = 0.0005
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Returns a line for every stage whose best time grew by more than threshold (a fraction).
+    """
+    regressions = []
+    for corpus, result in results["corpora"].items():
+        old_stages = baseline.get("corpora", {}).get(corpus, {}).get("stages", {})
+        for stage, timing in result["stages"].items():
+            if stage not in old_stages:
+                continue
+            old = old_stages[stage]["min"]
+            slower = timing["min"] - old
+            if (slower > MIN_REGRESSION_SECONDS) and (timing["min"] > old * (1 + threshold)):
+                regressions.append(f"{corpus}/{stage}: {old * 1000:.2f} ms -> {timing['min'] * 1000:.2f} ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="Write results as JSON to this file (default: stdout).")
+    parser.add_argument("--compare", help="A previous results file to check for regressions.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Slowdown that counts as a regression, as a fraction (default: 0.10).")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per stage; the best is reported.")
+    parser.add_argument("--pages", type=int, default=2000, help="Pages in the full-build corpus.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic corpora.")
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.pages, args.seed)
+    output = json.dumps(results, indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+
+    if args.compare is not None:
+        with open(args.compare, "r") as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        for line in regressions:
+            print(f"Regression: {line}", file=sys.stderr)
+        if len(regressions) > 0:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
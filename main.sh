@@ -1,2 +1,2 @@
-python3 src/main.py
-cd docs && python3 -m http.server 8890
\ No newline at end of file
+python3 src/main.py --atomic
+python3 -m http.server 8890 --directory docs
\ No newline at end of file
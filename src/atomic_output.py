@@ -0,0 +1,86 @@
+import errno
+import os
+import shutil
+
+from static_sync import place_file
+
+STAGING_SUFFIX = ".staging"
+OLD_SUFFIX = ".old"
+
+# From linux/fcntl.h and linux/fs.h: paths relative to the working directory; swap both paths.
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+def staging_path(public_path) -> str:
+    """
+    Returns the directory a build of public_path is staged in: a sibling of it,
+    so both are on the same filesystem and can be renamed into each other.
+    """
+    return os.path.normpath(public_path) + STAGING_SUFFIX
+
+def stage_output(public_path) -> str:
+    """
+    Creates a fresh staging directory for public_path holding a hardlink to every
+    file in the current output, so unchanged files cost neither a copy nor a write.
+    Outputs are only ever replaced (written to a temporary file and renamed, or
+    removed and placed again), never written through, so the current site is untouched.
+    Falls back to copying if the filesystem cannot hardlink. Returns the staging path.
+    """
+    staging = staging_path(public_path)
+    # Left behind by a build that crashed before its swap.
+    discard(staging)
+    os.makedirs(staging)
+    for dir_path, dir_names, file_names in os.walk(public_path):
+        dest_dir = os.path.normpath(os.path.join(staging, os.path.relpath(dir_path, public_path)))
+        for dir_name in dir_names:
+            os.makedirs(os.path.join(dest_dir, dir_name), exist_ok=True)
+        for file_name in file_names:
+            place_file(os.path.join(dir_path, file_name), os.path.join(dest_dir, file_name), "hardlink")
+    return staging
+
+def exchange_directories(path, other_path) -> bool:
+    """
+    Atomically swaps two paths with renameat2(RENAME_EXCHANGE).
+    Returns False, having changed nothing, where that is not available
+    (not Linux, an old C library or kernel, or a filesystem without support).
+    """
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        renameat2 = libc.renameat2
+    except (OSError, AttributeError, ImportError):
+        return False
+    renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    renameat2.restype = ctypes.c_int
+    if renameat2(AT_FDCWD, os.fsencode(path), AT_FDCWD, os.fsencode(other_path), RENAME_EXCHANGE) == 0:
+        return True
+    error = ctypes.get_errno()
+    if error in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+        return False
+    raise OSError(error, os.strerror(error), path, None, other_path)
+
+def swap_into_place(staging, public_path) -> bool:
+    """
+    Moves the finished build in staging to public_path and deletes the previous output.
+    With renameat2 the swap is atomic: every request sees either the old site or the
+    new one. Otherwise the old output is renamed aside first, leaving public_path
+    missing for the moment between two renames. Returns True if the swap was atomic.
+    """
+    public_path = os.path.normpath(public_path)
+    if not os.path.exists(public_path):
+        os.rename(staging, public_path)
+        return True
+    if exchange_directories(staging, public_path):
+        # staging now holds the previous output.
+        discard(staging)
+        return True
+    old_path = public_path + OLD_SUFFIX
+    discard(old_path)
+    os.rename(public_path, old_path)
+    os.rename(staging, public_path)
+    discard(old_path)
+    return False
+
+def discard(path):
+    if os.path.lexists(path):
+        shutil.rmtree(path)
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from manifest import GENERATOR_VERSION
+
+class BlockCache:
+    """
+    Memoizes the rendering of individual markdown blocks: any JSON-serialisable
+    value, such as the block's HTML and the link targets in it.
+    Entries live in an in-memory LRU of at most max_entries blocks and, if a
+    directory is given, in one file per block there, shared across builds and
+    across worker processes.
+    Keys cover the block text, the generator version and any rendering options
+    (for URLs, the site's base path, plus the page only for blocks whose links
+    resolve differently per page; see PageUrlResolver.key_for), so a change to
+    the parser (bump GENERATOR_VERSION) invalidates every entry.
+    """
+    def __init__(self, max_entries = 4096, directory = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, block: str, *options) -> str:
+        digest = hashlib.sha256(GENERATOR_VERSION.encode())
+        for option in options:
+            digest.update(b"\0" + str(option).encode())
+        digest.update(b"\0" + block.encode())
+        return digest.hexdigest()
+
+    def path_for(self, key) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        """
+        Returns the cached value for key, or None.
+        """
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        if self.directory is not None:
+            try:
+                with open(self.path_for(key), 'r') as block_file:
+                    value = json.load(block_file)
+            except (OSError, ValueError):
+                value = None
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.remember(key, value)
+        return value
+
+    def put(self, key, value):
+        self.remember(key, value)
+        if self.directory is not None:
+            path = self.path_for(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so another process never reads a half-written entry.
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as block_file:
+                json.dump(value, block_file)
+            os.replace(temp_path, path)
+
+    def remember(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
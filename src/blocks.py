@@ -9,48 +9,96 @@ class BlockType(Enum):
     UNORDERED_LIST = 16
     ORDERED_LIST = 32
 
+def iter_blocks(lines):
+    """
+    Splits markdown into blocks lazily, one line at a time.
+    Blocks are separated by blank lines, except inside ``` fenced code,
+    where blank lines belong to the code block.
+
+    :param lines: Any iterable of lines, e.g. an open file. Trailing newlines are ignored.
+    """
+    for line_number, block in iter_numbered_blocks(lines):
+        yield block
+
+def iter_numbered_blocks(lines, first_line = 1):
+    """
+    Like iter_blocks, but yields (line number, block), where the line number is
+    that of the block's first line, so errors in a block can point into the file.
+
+    :param first_line: The line number of the first of lines.
+    """
+    block_lines = []
+    block_start = first_line
+    in_fence = False
+    for line_number, line in enumerate(lines, start=first_line):
+        line = line.rstrip("\n")
+        if (not in_fence) and (line.strip() == ""):
+            if len(block_lines) > 0:
+                yield block_start, "\n".join(block_lines).strip()
+                block_lines = []
+            continue
+        if len(block_lines) == 0:
+            block_start = line_number
+        block_lines.append(line)
+        # An odd number of fences on a line opens or closes a code block.
+        if line.count("```") % 2 == 1:
+            in_fence = not in_fence
+
+    if len(block_lines) > 0:
+        block = "\n".join(block_lines).strip()
+        if block != "":
+            yield block_start, block
+
 def markdown_to_blocks(text: str) -> list:
-    raw_blocks = text.split('\n\n')
-    blocks = []
-    for block in raw_blocks:
-        stripped_block = block.strip()
-        if stripped_block != "":
-            blocks.append(stripped_block)
-    return blocks
+    return list(iter_blocks(text.split('\n')))
 
-def block_to_block_type(block: str) -> BlockType:
+HEADING_PATTERN = re.compile(r"#{1,6} \S")
+ORDERED_ITEM_PATTERN = re.compile(r"(\d+)\. ")
+
+def classify_block(block: str):
+    """
+    Works out a block's type in a single pass over its lines.
+    Returns (BlockType, lines), where lines is block.split('\n'),
+    so callers don't need to split the block again.
+    Ordered lists may start at any number, but must count up by one.
+    """
+    lines = block.split('\n')
     match block[0]:
         case '#':
-            if re.match(r'#{1,6} \S', block) != None:
-                return BlockType.HEADING
-            else:
-                return BlockType.PARAGRAPH
+            if HEADING_PATTERN.match(block) is not None:
+                return BlockType.HEADING, lines
         case "`":
             if (block[0:3] == "```") and (block[-3:] == "```") and len(block) > 6:
-                return BlockType.CODE
-            else:
-                return BlockType.PARAGRAPH
+                return BlockType.CODE, lines
         case ">":
-            if re.search(r"\n[^>]", block) == None:
-                return BlockType.QUOTE
-            else:
-                return BlockType.PARAGRAPH
+            for line in lines:
+                if line[0:1] != ">":
+                    return BlockType.PARAGRAPH, lines
+            return BlockType.QUOTE, lines
         case "-":
-            lines = block.split('\n')
             for line in lines:
                 if line[0:2] != "- ":
-                    return BlockType.PARAGRAPH
-            return BlockType.UNORDERED_LIST
-        
-        case "1":
-            lines = block.split('\n')
-            for index, line in enumerate(lines):
-                if (line[0] != f'{index + 1}') or (line[1:3] != ". "): # NOTE: Only works for fewer than 10 lines
-                    return BlockType.PARAGRAPH
-            return BlockType.ORDERED_LIST
-
-        case _:
-            return BlockType.PARAGRAPH
+                    return BlockType.PARAGRAPH, lines
+            return BlockType.UNORDERED_LIST, lines
+        case "0" | "1" | "2" | "3" | "4" | "5" | "6" | "7" | "8" | "9":
+            expected = None
+            for line in lines:
+                item = ORDERED_ITEM_PATTERN.match(line)
+                if item is None:
+                    return BlockType.PARAGRAPH, lines
+                number = int(item.group(1))
+                if (expected is not None) and (number != expected):
+                    return BlockType.PARAGRAPH, lines
+                expected = number + 1
+            return BlockType.ORDERED_LIST, lines
+
+    return BlockType.PARAGRAPH, lines
+
+def block_to_block_type(block: str) -> BlockType:
+    return classify_block(block)[0]
+
+def ordered_list_start(lines) -> int:
+    return int(ORDERED_ITEM_PATTERN.match(lines[0]).group(1))
 
 
 
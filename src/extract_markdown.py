@@ -1,20 +1,32 @@
 import re
 
+# Compiled once at import. Group 1 is the alt text or link text, group 2 the URL.
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
 def extract_markdown(text, regex):
     """
     Converts a markdown text string into a list of strings or tuples.
     Each output matches the included regex string.
 
     :param text: The string to extract from, in markdown format.
-    :param regex: The regular expression to match.
+    :param regex: The regular expression to match, as a string or a compiled pattern.
+    """
+    return re.findall(regex, text)
+
+def iter_markdown_images(text):
     """
-    markdown_matches = re.findall(regex, text)
+    Yields a match object for each markdown image in text, left to right.
+    match.span() gives its offsets; match.group(1) and match.group(2) give the alt text and URL.
+    """
+    return IMAGE_PATTERN.finditer(text)
 
-    output = []
-    for match in markdown_matches:
-        output.append(match)
-    
-    return output
+def iter_markdown_links(text):
+    """
+    Yields a match object for each markdown link in text, left to right.
+    match.span() gives its offsets; match.group(1) and match.group(2) give the text and URL.
+    """
+    return LINK_PATTERN.finditer(text)
 
 def extract_markdown_images(text):
     """
@@ -24,7 +36,7 @@ def extract_markdown_images(text):
 
     :param text: The string to extract images from, in markdown format.
     """
-    return extract_markdown(text, r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+    return extract_markdown(text, IMAGE_PATTERN)
 
 def extract_markdown_links(text):
     """
@@ -34,7 +46,7 @@ def extract_markdown_links(text):
 
     :param text: The string to extract links from, in markdown format.
     """
-    return extract_markdown(text, r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+    return extract_markdown(text, LINK_PATTERN)
 
 if __name__ == "__main__":
     print(extract_markdown_images("This is text with a ![rick roll](https://i.imgur.com/aKaOqIh.gif) and ![obi wan](https://i.imgur.com/fJRm4Vk.jpeg)"))
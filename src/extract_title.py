@@ -1,14 +1,18 @@
-def extract_title(markdown: str):
-    lines = markdown.split('\n')
-    header_found = False
+from source_error import SourceError
+
+def extract_title_from_lines(lines, first_line = 1):
+    """
+    Returns the text of the first first-level header ("# ") in the markdown.
+    Stops reading at the header, so for a file it usually only reads the first line.
+
+    :param lines: Any iterable of markdown lines, e.g. an open file.
+    :param first_line: The line number of the first of lines, where a missing title is reported.
+    """
     for line in lines:
         line = line.strip()
         if line[0:2] == '# ':
-            header_found = True
-            break
+            return line[2:]
+    raise SourceError("Markdown does not contain first-level header", first_line)
 
-    if header_found:
-        return line[2:]
-    else:
-        raise Exception("Markdown does not contain first-level header")
-    
+def extract_title(markdown: str, first_line = 1):
+    return extract_title_from_lines(markdown.split('\n'), first_line)
@@ -0,0 +1,104 @@
+import hashlib
+
+from source_error import SourceError
+
+FRONT_MATTER_FENCE = "---"
+
+def parse_value(value: str):
+    """
+    Parses one front matter value: a [a, b] flow list, a quoted string, or a plain string.
+    """
+    value = value.strip()
+    if value.startswith("[") and value.endswith("]"):
+        return [parse_value(item) for item in value[1:-1].split(",") if item.strip() != ""]
+    if (len(value) >= 2) and (value[0] == value[-1]) and (value[0] in "\"'"):
+        return value[1:-1]
+    return value
+
+def parse_front_matter_lines(lines) -> dict:
+    """
+    Parses the lines between the --- fences: "key: value" pairs, where a key
+    with no value may be followed by a block list of "- item" lines.
+    Blank lines and # comments are ignored. This is a YAML subset, not YAML.
+    """
+    metadata = {}
+    key = None
+    for number, line in enumerate(lines, start=2):
+        stripped = line.strip()
+        if (stripped == "") or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and (key is not None) and isinstance(metadata[key], list):
+            metadata[key].append(parse_value(stripped[2:]))
+            continue
+        name, separator, value = stripped.partition(":")
+        if (separator == "") or (name.strip() == ""):
+            raise SourceError(f"Front matter line is not 'key: value': {stripped}", number, 1)
+        key = name.strip()
+        metadata[key] = parse_value(value) if value.strip() != "" else []
+    return metadata
+
+class SourceReader:
+    """
+    Reads a markdown source once: the front matter (if the first line is ---)
+    is parsed up front, then iterating yields the body lines while counting
+    their words and hashing the whole text, so the page index costs no extra pass.
+
+    :param lines: The source's lines with their line endings, e.g. an open file.
+    """
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.digest = hashlib.sha256()
+        self.words = 0
+        self.metadata = {}
+        self.first_body_line = None
+        self.body_line = 1 # The line number of the first body line, for error positions
+
+        first = self.next_line()
+        if (first is not None) and (first.strip() == FRONT_MATTER_FENCE):
+            front_matter = []
+            while True:
+                line = self.next_line()
+                if line is None:
+                    raise SourceError("Front matter is missing its closing ---", 1, 1)
+                if line.strip() == FRONT_MATTER_FENCE:
+                    break
+                front_matter.append(line)
+            self.metadata = parse_front_matter_lines(front_matter)
+            self.body_line = len(front_matter) + 3
+        else:
+            self.first_body_line = first
+
+    def next_line(self):
+        line = next(self.lines, None)
+        if line is not None:
+            self.digest.update(line.encode())
+        return line
+
+    def __iter__(self):
+        if self.first_body_line is not None:
+            line, self.first_body_line = self.first_body_line, None
+            self.words += len(line.split())
+            yield line
+        while True:
+            line = self.next_line()
+            if line is None:
+                return
+            self.words += len(line.split())
+            yield line
+
+    def read_all(self):
+        """
+        Consumes the rest of the body, e.g. when it was rendered from a cache.
+        """
+        for line in self:
+            pass
+
+    def hash(self) -> str:
+        return self.digest.hexdigest()
+
+def parse_front_matter(markdown: str):
+    """
+    Returns (metadata, body) for a markdown string.
+    """
+    reader = SourceReader(markdown.splitlines(keepends=True))
+    return reader.metadata, "".join(reader)
@@ -1,4 +1,7 @@
 class HTMLNode:
+    # Slots instead of a per-instance __dict__: pages create thousands of nodes.
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag = None, value = None, children = None, props = None):
         self.tag = tag
         self.value = value
@@ -6,7 +9,26 @@ class HTMLNode:
         self.props = props
 
     def to_html(self) -> str:
-        raise NotImplementedError("to_html method not implemented on base HTMLNode class")
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        """
+        Yields the HTML for this node as a series of string fragments,
+        without building the whole document in memory.
+        """
+        raise NotImplementedError("iter_html method not implemented on base HTMLNode class")
+
+    def write_html(self, stream):
+        """
+        Writes the HTML for this node to a text stream (an open file, io.StringIO, ...).
+        """
+        for fragment in self.iter_html():
+            stream.write(fragment)
+    
+    def opening_tag(self) -> str:
+        if (self.props is None) or (len(self.props) == 0):
+            return f"<{self.tag}>"
+        return f"<{self.tag} {self.props_to_html()}>"
     
     def props_to_html(self) -> str:
         if self.props is None:
@@ -20,6 +42,8 @@ class HTMLNode:
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
     
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props = None):
         # A leaf node has no children. It must have a value.
         super().__init__(tag, value, None, props)
@@ -35,7 +59,12 @@ class LeafNode(HTMLNode):
         else:
             return f"<{self.tag} {self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def iter_html(self):
+        yield self.to_html()
+
 class NonClosingLeafNode(LeafNode):
+    __slots__ = ()
+
     def __init__(self, tag, props = None):
         # A non-closing leaf node has no children and no value. It must have a tag.
         super().__init__(tag, None, props)
@@ -52,21 +81,53 @@ class NonClosingLeafNode(LeafNode):
             return f"<{self.tag} {self.props_to_html()} />"
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props = None):
         # A parent node has children but no direct value.
         super().__init__(tag, None, children, props)
     
-    def to_html(self) -> str:
+    def validate(self):
         if self.tag is None:
             raise ValueError("ParentNode must have a tag")
         if ((self.children is None) or (len(self.children) == 0)):
             raise ValueError("ParentNode must have children")
-        
-        if (self.props is None) or (len(self.props) == 0):
-            opening_tag = f"<{self.tag}>"
-        else:
-            opening_tag = f"<{self.tag} {self.props_to_html()}>"
-        
-        children_html = "".join([child.to_html() for child in self.children])
-        closing_tag = f"</{self.tag}>"
-        return f"{opening_tag}{children_html}{closing_tag}"
\ No newline at end of file
+
+    def iter_html(self):
+        # Walks the tree with an explicit stack rather than nested generators,
+        # so each fragment is yielded once no matter how deep the tree is.
+        self.validate()
+        yield self.opening_tag()
+        stack = [(self, iter(self.children))]
+        while len(stack) > 0:
+            parent, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                yield f"</{parent.tag}>"
+            elif isinstance(child, ParentNode):
+                child.validate()
+                yield child.opening_tag()
+                stack.append((child, iter(child.children)))
+            else:
+                yield from child.iter_html()
+
+class StreamingParentNode(ParentNode):
+    __slots__ = ()
+
+    def __init__(self, tag, children, props = None):
+        # Children may be any iterable, e.g. a generator that builds each child on demand.
+        # It is consumed by the first call to iter_html, so the node can only be rendered once.
+        super().__init__(tag, children, props)
+
+    def iter_html(self):
+        if self.tag is None:
+            raise ValueError("ParentNode must have a tag")
+        yield self.opening_tag()
+        empty = True
+        for child in self.children:
+            empty = False
+            yield from child.iter_html()
+        if empty:
+            raise ValueError("ParentNode must have children")
+        yield f"</{self.tag}>"
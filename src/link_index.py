@@ -0,0 +1,79 @@
+import json
+import os
+from urllib.parse import urlsplit, unquote
+
+LINK_INDEX_PATH = ".cache/links.json"
+
+class LinkIndex:
+    """
+    Maps each source page to the link and image targets in it, as resolved site URLs.
+    Targets are collected while pages render, and pages skipped by an incremental
+    build keep the targets recorded last time, so the index always covers the whole site.
+    """
+    def __init__(self, path = LINK_INDEX_PATH, pages = None):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, path = LINK_INDEX_PATH):
+        try:
+            with open(path, 'r') as index_file:
+                return cls(path, json.load(index_file))
+        except (OSError, ValueError):
+            return cls(path)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w') as index_file:
+            json.dump(self.pages, index_file, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def record(self, source, targets: list):
+        self.pages[source] = targets
+
+    def retain(self, sources):
+        """
+        Drops the pages that are not in sources, e.g. because they were deleted.
+        """
+        sources = set(sources)
+        self.pages = {source: targets for source, targets in self.pages.items() if source in sources}
+
+    def broken(self, outputs, public_path, base_path = "/") -> list:
+        """
+        Returns a sorted list of (source page, target) pairs whose target is not
+        one of the outputs. External URLs and bare #fragments are not checked.
+
+        :param outputs: The paths of every generated page and copied static file.
+        :param public_path: The directory the outputs were written to.
+        :param base_path: The URL prefix the site was built for.
+        """
+        existing = {os.path.normpath(path) for path in outputs}
+        checked = {}
+        broken = []
+        for source, targets in sorted(self.pages.items()):
+            for target in targets:
+                if target not in checked:
+                    checked[target] = target_exists(target, existing, public_path, base_path)
+                if not checked[target]:
+                    broken.append((source, target))
+        return broken
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+def target_exists(target: str, existing: set, public_path, base_path = "/") -> bool:
+    parts = urlsplit(target)
+    if (parts.scheme != "") or (parts.netloc != "") or (parts.path == ""):
+        return True
+    if not parts.path.startswith(base_path):
+        return False
+
+    path = os.path.join(public_path, unquote(parts.path[len(base_path):]))
+    # A directory URL is served by its index.html, with or without the trailing slash.
+    candidates = [os.path.join(path, "index.html")]
+    if not parts.path.endswith("/"):
+        candidates.append(path)
+    return any(os.path.normpath(candidate) in existing for candidate in candidates)
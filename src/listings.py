@@ -0,0 +1,117 @@
+import json
+import re
+
+from htmlnode import LeafNode, ParentNode
+
+LISTING_SECTION = "/blog/"
+TAGS_URL = "/tags/"
+
+def slugify(tag: str) -> str:
+    """
+    Returns the URL path segment for a tag, e.g. "Middle-earth" -> "middle-earth".
+    """
+    return re.sub(r"[^a-z0-9]+", "-", tag.lower()).strip("-") or "tag"
+
+def listing_url(section_url: str, number: int) -> str:
+    """
+    Returns the site URL of page number of a listing: the section itself for the
+    first page, then section_url + "page/2/" and so on.
+    """
+    if number == 1:
+        return section_url
+    return f"{section_url}page/{number}/"
+
+def paginate(entries: list, page_size: int) -> list:
+    return [entries[start:start + page_size] for start in range(0, len(entries), page_size)]
+
+class ListingPage:
+    """
+    One page of a generated listing: a slice of page index entries, newest first,
+    with links to the neighbouring pages of the same listing.
+    """
+    __slots__ = ("url", "title", "entries", "number", "count", "section_url")
+
+    def __init__(self, url, title, entries, number, count, section_url):
+        self.url = url
+        self.title = title
+        self.entries = entries
+        self.number = number
+        self.count = count
+        self.section_url = section_url
+
+    def key(self) -> str:
+        """
+        Returns everything the page shows, as a string: a page is only rewritten
+        when this changes, not when an entry's content or word count does.
+        """
+        shown = [[entry["title"], entry["path"], entry["date"]] for entry in self.entries]
+        return json.dumps([self.title, self.number, self.count, shown])
+
+    def to_html_node(self, resolve_url) -> ParentNode:
+        """
+        :param resolve_url: Maps a root-relative site URL to the URL to link to (see UrlResolver.resolve).
+        """
+        items = []
+        for entry in self.entries:
+            children = [LeafNode("a", entry["title"], {"href": resolve_url(entry["path"])})]
+            if entry["date"] is not None:
+                children.append(LeafNode(None, " "))
+                children.append(LeafNode("time", entry["date"], {"datetime": entry["date"]}))
+            items.append(ParentNode("li", children))
+
+        navigation = []
+        if self.number > 1:
+            navigation.append(LeafNode("a", "Newer", {"href": resolve_url(listing_url(self.section_url, self.number - 1)), "rel": "prev"}))
+        navigation.append(LeafNode("span", f"Page {self.number} of {self.count}"))
+        if self.number < self.count:
+            navigation.append(LeafNode("a", "Older", {"href": resolve_url(listing_url(self.section_url, self.number + 1)), "rel": "next"}))
+
+        return ParentNode("div", [
+            LeafNode("h1", self.title),
+            ParentNode("ul", items, {"class": "listing"}),
+            ParentNode("nav", navigation, {"class": "pagination"}),
+        ])
+
+    def __repr__(self) -> str:
+        return f"ListingPage({self.url}, {self.number} of {self.count}, {len(self.entries)} entries)"
+
+def paginated(section_url, title, entries, page_size) -> list:
+    slices = paginate(entries, page_size)
+    pages = []
+    for number, entries_slice in enumerate(slices, start=1):
+        page_title = title if number == 1 else f"{title} (page {number})"
+        pages.append(ListingPage(listing_url(section_url, number), page_title, entries_slice, number, len(slices), section_url))
+    return pages
+
+def plan_listings(page_index, section_url = LISTING_SECTION, page_size = 10) -> list:
+    """
+    Returns the ListingPages for the site: the pages under section_url, newest first,
+    then one listing per tag under TAGS_URL and an index of the tags.
+    Sections and tags with no pages get no listing.
+
+    :param page_index: The PageIndex of every page on the site.
+    :param section_url: The site URL whose pages are listed, e.g. "/blog/".
+    :param page_size: The most entries on one listing page.
+    """
+    if page_size < 1:
+        raise ValueError(f"Listing page size must be at least 1, not {page_size}")
+    section_title = section_url.strip("/").replace("-", " ").capitalize() or "Pages"
+    pages = paginated(section_url, section_title, page_index.newest_first(section=section_url), page_size)
+
+    tag_entries = []
+    for tag in page_index.tags():
+        tag_url = f"{TAGS_URL}{slugify(tag)}/"
+        tagged = page_index.newest_first(tag)
+        pages.extend(paginated(tag_url, f"Tagged {tag}", tagged, page_size))
+        tag_entries.append({"title": f"{tag} ({len(tagged)})", "path": tag_url, "date": None})
+    pages.extend(paginated(TAGS_URL, "Tags", tag_entries, page_size))
+
+    content_paths = {entry["path"] for entry in page_index.pages.values()}
+    listing_urls = set()
+    for page in pages:
+        if page.url in content_paths:
+            raise ValueError(f"{page.url} is both a content page and a generated listing")
+        if page.url in listing_urls:
+            raise ValueError(f"Two tags share the listing {page.url}")
+        listing_urls.add(page.url)
+    return pages
@@ -1,75 +1,761 @@
 import os
 import sys
-import shutil
+import json
+import time
+import argparse
+from itertools import chain
+from contextlib import nullcontext
+from concurrent.futures import CancelledError, ProcessPoolExecutor
 
 from textnode import TextNode, TextType
-from extract_title import extract_title
-from markdown_to_html_node import markdown_to_html_node
+from extract_title import extract_title, extract_title_from_lines
+from front_matter import SourceReader
+from page_index import PageIndex, PAGE_INDEX_PATH, page_entry, page_path
+from markdown_to_html_node import markdown_to_html_node, INLINE_PARSERS
+from manifest import BuildManifest, GENERATOR_VERSION, hash_bytes, hash_file
+from template import Template, TemplateSet
+from profiler import BuildProfiler, TimedStream
+from static_sync import sync_dir, LINK_METHODS
+from block_cache import BlockCache
+from render_cache import RenderCache, RENDER_CACHE_PATH
+from url_resolver import UrlResolver, page_url
+from link_index import LinkIndex, LINK_INDEX_PATH
+from precompress import compress_outputs, ENCODINGS
+from page_io import BackgroundWriter, prefetch, file_matches, files_match
+from listings import ListingPage, LISTING_SECTION, plan_listings
+from atomic_output import stage_output, swap_into_place, discard
+from source_error import error_entry
 
 PUBLIC_PATH = "docs/"
 STATIC_PATH = "static/"
+CONTENT_PATH = "content/"
+TEMPLATE_PATH = "template.html"
+MANIFEST_PATH = ".cache/manifest.json"
+ERROR_REPORT_PATH = ".cache/errors.json"
 
-def copy_static_to_public():
-    def copy_dir_to_dir(source_path, dest_path):
-        source_contents = os.scandir(source_path)
-        for entry in source_contents:
-            dest = os.path.join(dest_path, entry.name)
-            if entry.is_dir():
-                os.mkdir(dest)
-                copy_dir_to_dir(entry.path, dest)
-            else:
-                shutil.copy(entry, dest)
-    #----
-
-    if os.path.exists(PUBLIC_PATH):
-        shutil.rmtree(PUBLIC_PATH)
-    os.mkdir(PUBLIC_PATH)
-    
-    copy_dir_to_dir(STATIC_PATH, PUBLIC_PATH)
-    
-def generate_page(base_path, from_path, template_path, dest_path):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}.")
-    
-    with open(from_path, 'r') as markdown_file:
-        markdown = markdown_file.read()
-
-    with open(template_path, 'r') as template_file:
-        template = template_file.read()
-
-    title = extract_title(markdown)
-    html_nodes = markdown_to_html_node(markdown)
-    html_content = html_nodes.to_html()
-
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html_content)
-    template = template.replace('href="/', f'href="{base_path}')
-    template = template.replace('src="/', f'src="{base_path}')
-
-    with open(dest_path, 'w') as page_file:
-        page_file.write(template)
-
-def generate_pages_in_dir(base_path, source_path, template_path, dest_path):
-    source_contents = os.scandir(source_path)
-    for entry in source_contents:
-        print(entry.name)
-        dest = os.path.join(dest_path, entry.name)
-        if entry.is_dir():
-            if not os.path.exists(dest):
-                os.mkdir(dest)
-            generate_pages_in_dir(base_path, entry.path, template_path, dest)
-        elif entry.name[-3:] == ".md":
-            generate_page(base_path, entry, template_path, dest[:-3] + ".html")
+def copy_static_to_public(manifest: BuildManifest, use_hash = False, method = "copy", public_path = PUBLIC_PATH):
+    """
+    Copies the static files for a full build. public_path is not cleared first,
+    so files that come out identical keep their mtimes; remove_unrecorded deletes
+    whatever the build did not produce once it is done.
+    """
+    os.makedirs(public_path, exist_ok=True)
+    sync_static_to_public(manifest, use_hash, method, public_path)
+
+def sync_static_to_public(manifest: BuildManifest, use_hash = False, method = "copy", public_path = PUBLIC_PATH):
+    """
+    Copies only the static files that changed since the last build.
+    Unlike copy_static_to_public, this leaves the rest of public_path in place.
+
+    :param public_path: The output directory (PUBLIC_PATH, or its staging directory).
+    """
+    copied, unchanged = sync_dir(STATIC_PATH, public_path, manifest, use_hash, method)
+    print(f"Static files: {copied} copied, {unchanged} unchanged.")
+
+def remove_orphans(manifest: BuildManifest):
+    """
+    Deletes outputs recorded by the previous build that this build did not produce,
+    then prunes any directories left empty.
+    """
+    for path in manifest.orphans():
+        print(f"Removing orphaned output {path}.")
+        if os.path.exists(path):
+            os.remove(path)
+        manifest.forget(path)
+        parent = os.path.dirname(path)
+        while (parent != "") and os.path.isdir(parent) and (len(os.listdir(parent)) == 0):
+            os.rmdir(parent)
+            parent = os.path.dirname(parent)
+
+def remove_unrecorded(manifest: BuildManifest, public_path = PUBLIC_PATH):
+    """
+    Deletes the files under public_path that this build did not produce,
+    then prunes any directories left empty.
+    """
+    for dir_path, dir_names, file_names in os.walk(public_path, topdown=False):
+        for file_name in file_names:
+            path = os.path.normpath(os.path.join(dir_path, file_name))
+            if path not in manifest.seen:
+                print(f"Removing stale output {path}.")
+                os.remove(path)
+        if (os.path.normpath(dir_path) != os.path.normpath(public_path)) and (len(os.listdir(dir_path)) == 0):
+            os.rmdir(dir_path)
+
+def page_inputs(base_path, from_path, template_hashes: dict, inline_parser = "split") -> dict:
+    """
+    :param template_hashes: {file: hash} for the page's template and the partials it includes
+        (see TemplateSet.dependency_hashes). This is the page's edge in the dependency graph.
+    """
+    return {
+        "source": hash_file(from_path),
+        "templates": template_hashes,
+        "base_path": base_path,
+        "generator": GENERATOR_VERSION,
+        "inline_parser": inline_parser,
+    }
+
+def _stage(profiler, name, page = None):
+    if profiler is None:
+        return nullcontext()
+    return profiler.stage(name, page)
+
+def generate_page(base_path, from_path, template, dest_path, inline_parser = "split", profiler = None, block_cache = None, render_cache = None, url_resolver = None, verbose = True):
+    """
+    Renders one markdown file into a page.
+    Returns (links, written, entry): the resolved URL of every link and image on the page,
+    in order, whether the page was written (False if dest_path was already identical),
+    and the page's PageIndex entry. A title in the front matter overrides the first heading.
+
+    :param template: A compiled Template, or the path of a template file to compile.
+    :param inline_parser: The name of the inline markdown parser to use (see INLINE_PARSERS).
+    :param profiler: An optional BuildProfiler to record the time spent in each stage.
+    :param block_cache: An optional BlockCache of rendered blocks.
+    :param render_cache: An optional RenderCache. On a hit, parsing is skipped entirely.
+    :param url_resolver: The PageUrlResolver for this page's links and images.
+        Defaults to one for base_path that leaves relative URLs relative.
+    :param verbose: Whether to print a progress line for the page.
+    """
+    if url_resolver is None:
+        url_resolver = UrlResolver(base_path).for_page()
+    if not isinstance(template, Template):
+        template = Template.from_file(template, base_path)
+    if verbose:
+        print(f"Generating page from {from_path} to {dest_path} using {template.path}.")
+
+    links = []
+    with _stage(profiler, "page", str(from_path)):
+        if render_cache is None:
+            # One pass over the file: the front matter, then the title (usually in the
+            # first lines), then the rest of the body streamed block by block into the
+            # output, so no full copy of it is ever held. The reader counts words and
+            # hashes the text as it streams through.
+            with open(from_path, 'r') as markdown_file:
+                source = SourceReader(markdown_file)
+                with _stage(profiler, "extract_title"):
+                    title, head = _read_title(source)
+                content = markdown_to_html_node(chain(head, source), inline_parser, profiler, url_resolver, block_cache, lazy=True, links=links, first_line=source.body_line)
+                written = write_page(template, dest_path, title, content, profiler)
+        else:
+            with _stage(profiler, "read"):
+                with open(from_path, 'r') as markdown_file:
+                    markdown = markdown_file.read()
+            title, content, links, source = render_page(markdown, inline_parser, profiler, block_cache, render_cache, url_resolver)
+            written = write_page(template, dest_path, title, content, profiler)
+        entry = page_entry(source, title, page_path(url_resolver.page_url, dest_path))
+
+        if profiler is not None:
+            profiler.bytes_read += os.path.getsize(from_path)
+            if written:
+                profiler.bytes_written += os.path.getsize(dest_path)
+    return links, written, entry
+
+def _read_title(source: SourceReader):
+    """
+    Returns (title, lines read): the title from the front matter, or else from the
+    first first-level heading, with the body lines read up to it kept so the body
+    can still be parsed from its start.
+    """
+    head = []
+    title = source.metadata.get("title")
+    if title:
+        return title, head
+
+    def kept():
+        for line in source:
+            head.append(line)
+            yield line
+    return extract_title_from_lines(kept(), source.body_line), head
+
+def render_page(markdown, inline_parser = "split", profiler = None, block_cache = None, render_cache = None, url_resolver = None):
+    """
+    Renders the text of a markdown file, without writing anything.
+    Returns (title, article HTML, links, source), from the render cache when it has
+    the page. source is the SourceReader the text was read through, for page_entry.
+    """
+    source = SourceReader(markdown.splitlines(keepends=True))
+    if render_cache is not None:
+        with _stage(profiler, "render cache lookup"):
+            cache_key = render_cache.key(markdown, inline_parser, url_resolver.key if url_resolver is not None else None)
+            cached = render_cache.get(cache_key)
+        if cached is not None:
+            source.read_all()
+            title, content, links = cached
+            return title, content, links, source
+
+    body = "".join(source)
+    links = []
+    with _stage(profiler, "extract_title"):
+        title = source.metadata.get("title") or extract_title(body, source.body_line)
+    with _stage(profiler, "markdown_to_html_node"):
+        content = markdown_to_html_node(body, inline_parser, profiler, url_resolver, block_cache, links=links, first_line=source.body_line).to_html()
+    if render_cache is not None:
+        render_cache.put(cache_key, title, content, links)
+    return title, content, links, source
+
+def write_page(template, dest_path, title, content, profiler = None) -> bool:
+    """
+    Writes the filled template to dest_path. content may be a string or an HTMLNode,
+    which is streamed into the file between the template segments.
+    The page is written to a temporary file first, so a failure part way through
+    never leaves a truncated page behind.
+    If dest_path already holds exactly this page it is left untouched, mtime and all,
+    and False is returned.
+    """
+    page = None
+    if isinstance(content, str):
+        # The whole page is in memory, so it can be compared before anything is written.
+        page = template.render(Title=title, Content=content)
+        if file_matches(dest_path, page.encode()):
+            return False
+
+    def write(stream):
+        if page is not None:
+            stream.write(page)
+        else:
+            template.write(stream, Title=title, Content=content)
+
+    temp_path = dest_path + ".tmp"
+    try:
+        if profiler is None:
+            with open(temp_path, 'w') as page_file:
+                write(page_file)
+        else:
+            # With a lazy content node, parsing happens here too. It is timed as "parsing"
+            # (see markdown_to_html_node), so take it out of the serialization time.
+            parsing = profiler.totals.get("parsing", 0.0)
+            with profiler.stage("serialize and write"):
+                start = time.perf_counter()
+                with open(temp_path, 'w') as page_file:
+                    stream = TimedStream(page_file)
+                    write(stream)
+                elapsed = time.perf_counter() - start
+            parsing = profiler.totals.get("parsing", 0.0) - parsing
+            profiler.add("write", stream.seconds)
+            profiler.add("serialization", elapsed - stream.seconds - parsing)
+        # A streamed page is only known once written, so compare the finished file instead.
+        if (page is None) and files_match(temp_path, dest_path):
+            os.remove(temp_path)
+            return False
+        os.replace(temp_path, dest_path)
+        return True
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+class BuildError(Exception):
+    """
+    Raised when one or more pages fail to render.
+    failures is a list of (source path, exception) pairs, in source order.
+    """
+    def __init__(self, failures: list):
+        self.failures = failures
+        lines = [f"{len(failures)} page(s) failed to render:"]
+        for source, error in failures:
+            lines.append(f"  {source}: {type(error).__name__}: {error}")
+        super().__init__("\n".join(lines))
+
+    def report(self) -> list:
+        """
+        Returns the failures as JSON error report entries (see error_entry).
+        """
+        return [error_entry(source, error) for source, error in self.failures]
+
+def write_error_report(path, failures: list):
+    """
+    Writes a JSON error report of failures, a list of (source path, exception) pairs,
+    to path. An empty report is written too, so a stale one never outlives its errors.
+    """
+    directory = os.path.dirname(path)
+    if directory != "":
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as report_file:
+        json.dump({"failed": len(failures), "errors": BuildError(failures).report()}, report_file, indent=1)
+
+def collect_pages(source_path, dest_path) -> list:
+    """
+    Walks source_path and returns a sorted list of (markdown path, html path) pairs,
+    mirroring the directory structure under dest_path.
+    """
+    pages = []
+    for dir_path, dir_names, file_names in os.walk(source_path):
+        dir_names.sort()
+        dest_dir = os.path.normpath(os.path.join(dest_path, os.path.relpath(dir_path, source_path)))
+        for file_name in sorted(file_names):
+            if file_name[-3:] == ".md":
+                pages.append((os.path.join(dir_path, file_name), os.path.join(dest_dir, file_name[:-3] + ".html")))
+    return pages
+
+# Each worker process keeps its own block cache and render cache connection for the whole build.
+_worker_caches = {}
+
+def _worker_cache(cache_class, settings):
+    if settings is None:
+        return None
+    if (cache_class, settings) not in _worker_caches:
+        _worker_caches[(cache_class, settings)] = cache_class(*settings)
+    return _worker_caches[(cache_class, settings)]
+
+def _render_page(job):
+    # Runs in a worker process, so errors are returned rather than raised,
+    # along with the page's links, whether it was written, its page index entry
+    # and the worker's timings when profiling. Progress is printed by the parent,
+    # in page order, rather than interleaved from every worker.
+    base_path, from_path, template, dest_path, page_url, inline_parser, profile, block_cache_settings, render_cache_settings = job
+    profiler = BuildProfiler() if profile else None
+    block_cache = _worker_cache(BlockCache, block_cache_settings)
+    render_cache = _worker_cache(RenderCache, render_cache_settings)
+    url_resolver = _worker_cache(UrlResolver, (base_path,)).for_page(page_url)
+    try:
+        links, written, entry = generate_page(base_path, from_path, template, dest_path, inline_parser, profiler, block_cache, render_cache, url_resolver, verbose=False)
+    except Exception as error:
+        return error, None, False, None, None
+    return None, links, written, entry, (profiler.to_dict() if profile else None)
+
+def generate_pages_in_dir(base_path, source_path, template_path, dest_path, manifest = None, jobs = 1, inline_parser = "split", profiler = None, block_cache = None, render_cache = None, url_resolver = None, link_index = None, io_queue_size = 0, page_index = None, keep_going = False):
+    """
+    Renders every markdown file under source_path to HTML under dest_path.
+    Each page uses the nearest template.html at or above its directory under
+    source_path, or template_path if there is none (see TemplateSet).
+    Returns (pages written, pages unchanged): a page is unchanged if the manifest
+    shows it is up to date or if rendering it produced the file already on disk.
+
+    :param manifest: If given, pages whose inputs are unchanged since the last build are skipped.
+    :param jobs: Number of worker processes. 1 renders serially in this process.
+    :param inline_parser: The name of the inline markdown parser to use (see INLINE_PARSERS).
+    :param profiler: An optional BuildProfiler; worker timings are merged into it.
+    :param block_cache: An optional BlockCache. Worker processes each build one with the same settings.
+    :param render_cache: An optional RenderCache. Worker processes each open the same file.
+    :param url_resolver: The UrlResolver shared by every page (default: a new one for base_path).
+        Worker processes each keep their own.
+    :param link_index: An optional LinkIndex to record the links of each rendered page in.
+    :param io_queue_size: When rendering serially, read up to this many sources ahead and
+        write up to this many finished pages in background threads. 0 does all I/O inline.
+    :param page_index: An optional PageIndex to record each rendered page's metadata in.
+    :param keep_going: Render every other page after one fails, and raise a BuildError listing
+        every failure at the end. Otherwise the first failure stops the build.
+    """
+    build = BuildOptions(base_path, dest_path, inline_parser, profiler, block_cache, render_cache, url_resolver, manifest, link_index, page_index, keep_going)
+    pages = []
+    with _stage(profiler, "collect pages"):
+        collected = collect_pages(source_path, dest_path)
+    if link_index is not None:
+        link_index.retain(from_path for from_path, page_dest in collected)
+    if page_index is not None:
+        page_index.retain(from_path for from_path, page_dest in collected)
+    # Each template is read, expanded and split once per build, not once per page.
+    templates = TemplateSet(template_path, base_path, source_path)
+    with _stage(profiler, "compile templates"):
+        page_templates = [_page_template(templates, from_path) for from_path, page_dest in collected]
+    template_failures = []
+    for (from_path, page_dest), (template, template_hashes, error) in zip(collected, page_templates):
+        if error is not None:
+            if not keep_going:
+                raise BuildError([(from_path, error)]) from error
+            template_failures.append((from_path, error))
+            if manifest is not None:
+                manifest.keep(page_dest)
+            continue
+        if manifest is not None:
+            inputs = page_inputs(base_path, from_path, template_hashes, inline_parser)
+            if manifest.is_current(page_dest, inputs):
+                print(f"Skipping {from_path}: {page_dest} is up to date.")
+                continue
+            build.page_inputs[page_dest] = inputs
+        os.makedirs(os.path.dirname(page_dest), exist_ok=True)
+        pages.append((from_path, page_dest, template))
+
+    if ((jobs == 1) or (len(pages) <= 1)) and (io_queue_size > 0):
+        written, failures = _generate_pages_with_background_io(pages, build, io_queue_size)
+    elif (jobs == 1) or (len(pages) <= 1):
+        written, failures = _generate_pages_serially(pages, build)
+    else:
+        written, failures = _generate_pages_in_parallel(pages, build, jobs)
+    if len(template_failures) > 0:
+        order = {from_path: index for index, (from_path, page_dest) in enumerate(collected)}
+        failures = sorted(template_failures + failures, key=lambda failure: order[failure[0]])
+
+    unchanged = len(collected) - len(failures) - written
+    if len(failures) > 0:
+        print(f"Pages: {written} written, {unchanged} unchanged, {len(failures)} failed.")
+    else:
+        print(f"Pages: {written} written, {unchanged} unchanged.")
+    if len(failures) > 0:
+        raise BuildError(failures)
+    return written, unchanged
+
+def _page_template(templates: TemplateSet, from_path):
+    # A missing partial or an include cycle fails the pages using that template
+    # like any other page error, so the error is returned rather than raised,
+    # along with the template and the hashes of the files it was built from.
+    try:
+        template = templates.template_for(from_path)
+        return template, templates.dependency_hashes(template), None
+    except Exception as error:
+        return None, None, error
+
+class BuildOptions:
+    """
+    What every page of a generate_pages_in_dir build is rendered with, and the
+    indexes each finished page is recorded in, passed to its helpers as one object.
+    page_inputs maps each page to be rendered to its manifest inputs.
+    """
+    def __init__(self, base_path, dest_path, inline_parser = "split", profiler = None, block_cache = None, render_cache = None, url_resolver = None, manifest = None, link_index = None, page_index = None, keep_going = False):
+        self.base_path = base_path
+        self.dest_path = dest_path
+        self.inline_parser = inline_parser
+        self.profiler = profiler
+        self.block_cache = block_cache
+        self.render_cache = render_cache
+        self.url_resolver = url_resolver if url_resolver is not None else UrlResolver(base_path)
+        self.manifest = manifest
+        self.link_index = link_index
+        self.page_index = page_index
+        self.keep_going = keep_going
+        self.page_inputs = {}
+
+    def resolver_for(self, page_dest):
+        return self.url_resolver.for_page(page_url(page_dest, self.dest_path))
+
+    def record(self, from_path, page_dest, links, entry):
+        """
+        Records a page whose output is on disk in the link index, page index and manifest.
+        """
+        if self.link_index is not None:
+            self.link_index.record(from_path, links)
+        if self.page_index is not None:
+            self.page_index.record(from_path, entry)
+        if self.manifest is not None:
+            self.manifest.record(page_dest, self.page_inputs[page_dest])
+
+def _generate_pages_serially(pages, build: BuildOptions):
+    """
+    Renders and writes pages one by one in this process. Returns (pages written, failures).
+    """
+    failures = []
+    written = 0
+    for from_path, page_dest, template in pages:
+        try:
+            links, page_written, entry = generate_page(build.base_path, from_path, template, page_dest, build.inline_parser, build.profiler, build.block_cache, build.render_cache, build.resolver_for(page_dest))
+        except Exception as error:
+            if not build.keep_going:
+                raise BuildError([(from_path, error)]) from error
+            failures.append((from_path, error))
+            continue
+        written += page_written
+        build.record(from_path, page_dest, links, entry)
+    return written, failures
+
+def _generate_pages_in_parallel(pages, build: BuildOptions, jobs):
+    """
+    Renders pages across jobs worker processes. Returns (pages written, failures).
+    Without keep_going, the first failure cancels the pages no worker has started;
+    pages that still finish are recorded before the BuildError is raised.
+    """
+    profiler = build.profiler
+    block_cache_settings = (build.block_cache.max_entries, build.block_cache.directory) if build.block_cache is not None else None
+    render_cache_settings = (build.render_cache.path, build.render_cache.max_bytes) if build.render_cache is not None else None
+    page_jobs = [
+        (build.base_path, from_path, template, page_dest, page_url(page_dest, build.dest_path), build.inline_parser, profiler is not None, block_cache_settings, render_cache_settings)
+        for from_path, page_dest, template in pages
+    ]
+    chunk_size = max(1, len(page_jobs) // (jobs * 4))
+    failures = []
+    written = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # map yields results in submission order, so reporting is deterministic.
+        results = executor.map(_render_page, page_jobs, chunksize=chunk_size)
+        try:
+            for (from_path, page_dest, template), (error, links, page_written, entry, timings) in zip(pages, results):
+                print(f"Generating page from {from_path} to {page_dest} using {template.path}.")
+                if timings is not None:
+                    profiler.merge(timings)
+                if error is not None:
+                    failures.append((from_path, error))
+                    if not build.keep_going:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                    continue
+                written += page_written
+                build.record(from_path, page_dest, links, entry)
+        except CancelledError:
+            pass
+    if (len(failures) > 0) and not build.keep_going:
+        raise BuildError(failures)
+    return written, failures
+
+def _generate_pages_with_background_io(pages, build: BuildOptions, io_queue_size):
+    """
+    The serial loop of generate_pages_in_dir with I/O overlapped with parsing:
+    sources are prefetched and finished pages are written by a BackgroundWriter,
+    each at most io_queue_size pages ahead. Pages are recorded once their write
+    has succeeded, including those already queued when a failure stops the build.
+    Returns (pages written, failures); a failed write is only known once queued,
+    so write failures never stop the loop early.
+    """
+    profiler = build.profiler
+    failures = []
+    writes = []
+    with BackgroundWriter(io_queue_size) as writer:
+        sources = prefetch((from_path for from_path, page_dest, template in pages), io_queue_size)
+        for (from_path, page_dest, template), (_, read) in zip(pages, sources):
+            print(f"Generating page from {from_path} to {page_dest} using {template.path}.")
+            try:
+                with _stage(profiler, "read"):
+                    markdown = read.result()
+                with _stage(profiler, "page", str(from_path)):
+                    page_resolver = build.resolver_for(page_dest)
+                    title, content, links, source = render_page(markdown, build.inline_parser, profiler, build.block_cache, build.render_cache, page_resolver)
+            except Exception as error:
+                failures.append((from_path, error))
+                if not build.keep_going:
+                    break
+                continue
+            if profiler is not None:
+                profiler.bytes_read += len(markdown.encode())
+            entry = page_entry(source, title, page_path(page_resolver.page_url, page_dest))
+            writes.append((from_path, page_dest, links, entry, writer.submit(write_page, template, page_dest, title, content)))
+
+    # The writer has finished every queued write, so each page is either on disk or failed.
+    written = 0
+    for from_path, page_dest, links, entry, write in writes:
+        error = write.exception()
+        if error is not None:
+            failures.append((from_path, error))
+            continue
+        if write.result():
+            written += 1
+            if profiler is not None:
+                profiler.bytes_written += os.path.getsize(page_dest)
+        build.record(from_path, page_dest, links, entry)
+    # Report in source order, whichever stage each page failed in.
+    order = {from_path: index for index, (from_path, page_dest, template) in enumerate(pages)}
+    failures.sort(key=lambda failure: order[failure[0]])
+    if (len(failures) > 0) and not build.keep_going:
+        raise BuildError(failures)
+    return written, failures
+
+def listing_inputs(base_path, listing: ListingPage, template_hashes: dict) -> dict:
+    return {
+        "listing": hash_bytes(listing.key().encode()),
+        "templates": template_hashes,
+        "base_path": base_path,
+        "generator": GENERATOR_VERSION,
+    }
+
+def generate_listing_pages(base_path, page_index: PageIndex, source_path, template_path, dest_path, manifest = None, url_resolver = None, section_url = LISTING_SECTION, page_size = 10):
+    """
+    Writes the listing pages planned from page_index (see plan_listings) under dest_path.
+    Each uses the template a content page at its URL would. A listing page is only
+    rendered if the entries it shows, its position or its template changed since it
+    was recorded in the manifest; listing pages recorded before but no longer planned
+    (e.g. a tag that went away) are deleted. Returns (pages written, pages unchanged).
+    Listing pages whose template fails to load are reported in a BuildError once the
+    rest are written.
+
+    :param manifest: If given, listing pages whose slice is unchanged are skipped.
+    :param url_resolver: The UrlResolver for the links (default: a new one for base_path).
+    :param section_url: The site URL whose pages are listed.
+    :param page_size: The most entries on one listing page.
+    """
+    if url_resolver is None:
+        url_resolver = UrlResolver(base_path)
+    try:
+        listings = plan_listings(page_index, section_url, page_size)
+    except ValueError as error:
+        raise BuildError([("listings", error)]) from error
+    templates = TemplateSet(template_path, base_path, source_path)
+    written = 0
+    produced = set()
+    failures = []
+    for listing in listings:
+        listing_dest = os.path.normpath(os.path.join(dest_path, listing.url[1:], "index.html"))
+        produced.add(listing_dest)
+        template, template_hashes, error = _page_template(templates, os.path.join(source_path, listing.url[1:], "index.md"))
+        if error is not None:
+            failures.append((listing.url, error))
+            if manifest is not None:
+                manifest.keep(listing_dest)
+            continue
+        inputs = listing_inputs(base_path, listing, template_hashes)
+        if (manifest is not None) and manifest.is_current(listing_dest, inputs):
+            continue
+        print(f"Generating listing {listing.url} to {listing_dest} using {template.path}.")
+        os.makedirs(os.path.dirname(listing_dest), exist_ok=True)
+        content = listing.to_html_node(url_resolver.resolve).to_html()
+        written += write_page(template, listing_dest, listing.title, content)
+        if manifest is not None:
+            manifest.record(listing_dest, inputs)
+
+    if manifest is not None:
+        for path, inputs in sorted(manifest.entries.items()):
+            if ("listing" in inputs) and (path not in produced):
+                print(f"Removing listing {path}.")
+                if os.path.exists(path):
+                    os.remove(path)
+                manifest.forget(path)
+                try:
+                    os.removedirs(os.path.dirname(path))
+                except OSError:
+                    pass
+    unchanged = len(listings) - len(failures) - written
+    if len(failures) > 0:
+        print(f"Listing pages: {written} written, {unchanged} unchanged, {len(failures)} failed.")
+        raise BuildError(failures)
+    print(f"Listing pages: {written} written, {unchanged} unchanged.")
+    return written, unchanged
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generate the static site from content/ into docs/.")
+    parser.add_argument("base_path", nargs="?", default="/",
+                        help="URL prefix the site is served under (default: /).")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only rebuild pages and static files whose inputs changed since the last build.")
+    parser.add_argument("--atomic", action="store_true",
+                        help=f"Build into a staging copy of {PUBLIC_PATH} (hardlinked, so unchanged files are not copied) and swap it into place once the build succeeds.")
+    parser.add_argument("--static-hash", action="store_true",
+                        help="Detect changed static files by content hash instead of size and mtime.")
+    parser.add_argument("--static-link", choices=LINK_METHODS, default="copy",
+                        help="Place static files by copying, hardlinking or reflinking them (default: copy).")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of processes to render pages with. 0 uses every CPU (default: 1).")
+    parser.add_argument("--keep-going", action="store_true",
+                        help=f"Render every other page when one fails, list every failure with its line and column, and write them to a JSON error report (default: {ERROR_REPORT_PATH}).")
+    parser.add_argument("--error-report", metavar="PATH",
+                        help=f"Write the build's errors as JSON to PATH (implied, at {ERROR_REPORT_PATH}, by --keep-going).")
+    parser.add_argument("--io-queue", type=int, default=0, metavar="N",
+                        help="With -j 1, read up to N sources ahead and write up to N finished pages in background threads (default: 0, inline I/O).")
+    parser.add_argument("--inline-parser", choices=sorted(INLINE_PARSERS), default="split",
+                        help="Inline markdown parser: the multi-pass 'split' pipeline or the single-pass 'scan' (default: split).")
+    parser.add_argument("--block-cache", action="store_true",
+                        help="Cache the rendered HTML of each markdown block, so repeated blocks are parsed once.")
+    parser.add_argument("--block-cache-size", type=int, default=4096, metavar="N",
+                        help="Blocks kept in memory per process by --block-cache (default: 4096).")
+    parser.add_argument("--block-cache-dir", metavar="DIR",
+                        help="Also store cached blocks on disk in DIR, shared across builds (implies --block-cache).")
+    parser.add_argument("--render-cache", action="store_true",
+                        help=f"Keep rendered pages in {RENDER_CACHE_PATH} and skip parsing pages whose markdown is unchanged.")
+    parser.add_argument("--render-cache-size", type=int, default=256, metavar="MB",
+                        help="Evict the least recently used pages once the render cache exceeds this size (default: 256).")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="Empty the render cache before building.")
+    parser.add_argument("--check-links", action="store_true",
+                        help="Report links and images that point at no generated page or static file, and fail the build if there are any.")
+    parser.add_argument("--listings", action="store_true",
+                        help=f"Generate paginated, newest-first listings of the pages under a section (default: {LISTING_SECTION}) and of each front matter tag.")
+    parser.add_argument("--listing-section", default=LISTING_SECTION, metavar="URL",
+                        help=f"Site URL whose pages --listings lists, with slashes at both ends (default: {LISTING_SECTION}).")
+    parser.add_argument("--listing-page-size", type=int, default=10, metavar="N",
+                        help="Entries per listing page (default: 10).")
+    parser.add_argument("--precompress", action="store_true",
+                        help=f"Write {' and '.join(ENCODINGS)} copies of generated HTML and static CSS/JS/SVG, for servers that send precompressed files.")
+    parser.add_argument("--precompress-min-size", type=int, default=1024, metavar="BYTES",
+                        help="Only precompress files of at least this size (default: 1024).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time each build stage and print a report with the slowest pages.")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="Number of slowest pages to list in the profile report (default: 10).")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="Write a Chrome trace-event JSON file for this build (implies --profile).")
+    return parser.parse_args(argv)
 
 def main():
+    args = parse_args(sys.argv[1:])
+    base_path = args.base_path
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    profiler = BuildProfiler() if (args.profile or (args.trace is not None)) else None
+    block_cache = None
+    if args.block_cache or (args.block_cache_dir is not None):
+        block_cache = BlockCache(args.block_cache_size, args.block_cache_dir)
+    render_cache = None
+    if args.clear_cache and os.path.exists(RENDER_CACHE_PATH):
+        RenderCache(RENDER_CACHE_PATH).clear()
+    if args.render_cache:
+        render_cache = RenderCache(RENDER_CACHE_PATH, args.render_cache_size * 1024 * 1024)
+
+    # A full build still records a manifest, so the next build can be incremental.
+    incremental = args.incremental and os.path.isdir(PUBLIC_PATH)
+    if incremental:
+        manifest = BuildManifest.load(MANIFEST_PATH)
+        link_index = LinkIndex.load(LINK_INDEX_PATH)
+        page_index = PageIndex.load(PAGE_INDEX_PATH)
+    else:
+        manifest = BuildManifest(MANIFEST_PATH)
+        link_index = LinkIndex(LINK_INDEX_PATH)
+        page_index = PageIndex(PAGE_INDEX_PATH)
+    public_path = PUBLIC_PATH
+    if args.atomic:
+        # Serving carries on from PUBLIC_PATH while the build happens in the staging copy.
+        with _stage(profiler, "stage output"):
+            public_path = stage_output(PUBLIC_PATH)
+        manifest.rebase(PUBLIC_PATH, public_path)
+    with _stage(profiler, "static copy"):
+        if incremental:
+            sync_static_to_public(manifest, args.static_hash, args.static_link, public_path)
+        else:
+            copy_static_to_public(manifest, args.static_hash, args.static_link, public_path)
+
+    failed = False
+    failures = []
     try:
-        base_path = sys.argv[1]
-    except IndexError:
-        base_path = "/"
-    
-    template_path = "template.html"
-    docs_dir = "docs/"
-    copy_static_to_public()
-    generate_pages_in_dir(base_path, "content/", template_path, docs_dir)
+        with _stage(profiler, "generate pages"):
+            generate_pages_in_dir(base_path, CONTENT_PATH, TEMPLATE_PATH, public_path, manifest, jobs, args.inline_parser, profiler, block_cache, render_cache, link_index=link_index, io_queue_size=args.io_queue, page_index=page_index, keep_going=args.keep_going)
+    except BuildError as error:
+        # Keep what did render, so the next incremental build only retries the failures.
+        print(error, file=sys.stderr)
+        failures.extend(error.failures)
+        failed = True
+    if args.listings:
+        try:
+            with _stage(profiler, "listings"):
+                generate_listing_pages(base_path, page_index, CONTENT_PATH, TEMPLATE_PATH, public_path, manifest, section_url=args.listing_section, page_size=args.listing_page_size)
+        except BuildError as error:
+            print(error, file=sys.stderr)
+            failures.extend(error.failures)
+            failed = True
+    error_report = args.error_report
+    if args.keep_going and (error_report is None):
+        error_report = ERROR_REPORT_PATH
+    if error_report is not None:
+        write_error_report(error_report, failures)
+    if args.precompress:
+        # Before orphan removal, so the siblings of deleted pages become orphans too.
+        with _stage(profiler, "precompress"):
+            compressed, unchanged = compress_outputs(public_path, manifest, args.precompress_min_size)
+        print(f"Precompressed files: {compressed} compressed, {unchanged} unchanged.")
+    remove_orphans(manifest)
+    if not args.incremental:
+        remove_unrecorded(manifest, public_path)
+    if args.check_links:
+        broken = link_index.broken(manifest.entries, public_path, base_path)
+        for source, target in broken:
+            print(f"Broken link in {source}: {target}", file=sys.stderr)
+        print(f"Links: {len(broken)} broken across {len(link_index)} pages.")
+        if len(broken) > 0:
+            failed = True
+
+    if args.atomic and failed:
+        # The previous site stays up, and the previous manifest still describes it.
+        print(f"Build failed; leaving {PUBLIC_PATH} as it was.", file=sys.stderr)
+        discard(public_path)
+    else:
+        if args.atomic:
+            with _stage(profiler, "swap output"):
+                if not swap_into_place(public_path, PUBLIC_PATH):
+                    print("Atomic directory exchange is not supported here; swapped with two renames.", file=sys.stderr)
+            manifest.rebase(public_path, PUBLIC_PATH)
+        manifest.save()
+        link_index.save()
+        page_index.save()
+    if render_cache is not None:
+        render_cache.evict()
+        render_cache.close()
+
+    if profiler is not None:
+        print(profiler.report(args.profile_top), file=sys.stderr)
+        if args.trace is not None:
+            profiler.write_trace(args.trace)
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
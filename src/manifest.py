@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+
+GENERATOR_VERSION = "3"
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's contents, read in chunks.
+
+    :param path: The file to hash.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class BuildManifest:
+    """
+    Records, for every output file, the inputs it was built from.
+    An output whose recorded inputs match the current inputs (and which still
+    exists on disk) does not need to be rebuilt.
+    Outputs recorded by a previous build but not produced by this one are orphans.
+    """
+    def __init__(self, path, entries = None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.seen = set()
+
+    @classmethod
+    def load(cls, path):
+        # A missing or unreadable manifest just means a full rebuild.
+        try:
+            with open(path, 'r') as manifest_file:
+                data = json.load(manifest_file)
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get("version") != GENERATOR_VERSION:
+            return cls(path)
+        return cls(path, data.get("outputs", {}))
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w') as manifest_file:
+            json.dump({"version": GENERATOR_VERSION, "outputs": self.entries}, manifest_file, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def is_current(self, output_path, inputs: dict) -> bool:
+        """
+        Marks output_path as produced by this build and returns True if its
+        recorded inputs are unchanged and the file still exists.
+
+        :param output_path: The path of the generated file.
+        :param inputs: A JSON-serialisable dict describing everything the output depends on.
+        """
+        output_path = os.path.normpath(output_path)
+        self.seen.add(output_path)
+        return (self.entries.get(output_path) == inputs) and os.path.exists(output_path)
+
+    def record(self, output_path, inputs: dict):
+        output_path = os.path.normpath(output_path)
+        self.seen.add(output_path)
+        self.entries[output_path] = inputs
+
+    def keep(self, output_path):
+        """
+        Marks output_path as produced by this build without recording new inputs,
+        e.g. for a page that failed to build, so its last good output is not an orphan.
+        """
+        self.seen.add(os.path.normpath(output_path))
+
+    def forget(self, output_path):
+        self.entries.pop(os.path.normpath(output_path), None)
+
+    def rebase(self, old_dir, new_dir):
+        """
+        Moves the outputs recorded under old_dir to the same paths under new_dir,
+        e.g. while a build is staged in another directory.
+        """
+        old_dir = os.path.normpath(old_dir)
+        new_dir = os.path.normpath(new_dir)
+
+        def moved(path):
+            if (path == old_dir) or path.startswith(old_dir + os.sep):
+                return new_dir + path[len(old_dir):]
+            return path
+
+        self.entries = {moved(path): inputs for path, inputs in self.entries.items()}
+        self.seen = {moved(path) for path in self.seen}
+
+    def dependents(self, paths, key = "templates") -> list:
+        """
+        Returns the outputs whose recorded inputs[key], a dict keyed by file path,
+        names any of paths: e.g. the pages built with a given template or partial.
+        """
+        paths = {os.path.normpath(path) for path in paths}
+        return sorted(
+            output for output, inputs in self.entries.items()
+            if any(path in paths for path in inputs.get(key, ()))
+        )
+
+    def orphans(self) -> list:
+        """
+        Returns the outputs recorded by a previous build that this build did not produce.
+        """
+        return sorted(path for path in self.entries if path not in self.seen)
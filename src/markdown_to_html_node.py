@@ -1,20 +1,73 @@
+from functools import partial
+
 import textnode
 import htmlnode
 import blocks
 from split_nodes import text_to_textnodes
-from text_node_to_html_node import text_node_to_html_node
+from scan_inline import scan_inline
+from text_node_to_html_node import text_node_to_html_node as text_node_to_leaf
+from source_error import SourceError
+
+# Inline parsers selectable by name, so their output can be compared on real content.
+INLINE_PARSERS = {
+    "split": text_to_textnodes,
+    "scan": scan_inline,
+}
+
+def markdown_to_html_node(markdown, inline_parser = "split", profiler = None, url_resolver = None, block_cache = None, lazy = False, links = None, first_line = 1) -> htmlnode.ParentNode:
+    """
+    Converts a markdown document into a div ParentNode with one child per block.
 
-def markdown_to_html_node(markdown: str) -> htmlnode.ParentNode:
+    :param markdown: The markdown text, or an iterable of its lines (e.g. an open file).
+    :param inline_parser: The name of an entry in INLINE_PARSERS.
+    :param profiler: An optional BuildProfiler that accumulates time per parsing stage.
+    :param url_resolver: An optional PageUrlResolver, applied to link and image URLs as their nodes are built.
+    :param block_cache: An optional BlockCache. Cached blocks come back as raw-HTML LeafNodes.
+    :param lazy: Return a StreamingParentNode that reads and parses each block only as it
+        is serialized, so memory stays bounded by the largest block rather than the document.
+    :param links: An optional list. The (resolved) URL of every link and image is appended
+        to it as its node is built, or as its block is read from the block cache.
+    :param first_line: The line number of the markdown's first line in its file (e.g. after
+        front matter). Inline errors are raised as SourceErrors at file lines and columns.
+    """
+    text_to_textnodes = INLINE_PARSERS[inline_parser]
+    classify_block = blocks.classify_block
+    text_node_to_html_node = text_node_to_leaf
+    if (links is None) and (block_cache is not None):
+        links = [] # Cached blocks record their links whether or not the caller wants them
+    if (url_resolver is not None) or (links is not None):
+        def resolve_url(url):
+            if url_resolver is not None:
+                url = url_resolver.resolve(url)
+            if links is not None:
+                links.append(url)
+            return url
+        text_node_to_html_node = partial(text_node_to_leaf, resolve_url=resolve_url)
+    if profiler is not None:
+        text_to_textnodes = profiler.timed("inline parsing", text_to_textnodes)
+        classify_block = profiler.timed("block parsing", classify_block)
+        text_node_to_html_node = profiler.timed("node construction", text_node_to_html_node)
 
-    def block_to_html_node(block):
-        block_type = (blocks.block_to_block_type(block))
+    def parse_inline(text, block, offset, block_line):
+        # text starts offset characters into block, with the same length per line.
+        try:
+            return text_to_textnodes(text)
+        except SourceError as error:
+            if error.column is None:
+                raise
+            position = offset + error.column - 1
+            line_start = block.rfind('\n', 0, position) + 1
+            raise error.located(block_line + block.count('\n', 0, position), position - line_start + 1) from None
+
+    def block_to_html_node(block, block_line):
+        block_type, lines = classify_block(block)
         line_tag = None # Tag for each line of a multiline tag
-        line_markdown = None # Markdown for each line of a multiline tag
 
         match (block_type):
             case blocks.BlockType.PARAGRAPH:
                 block_node = htmlnode.ParentNode(tag='p', children=[])
                 text = block
+                offset = 0
 
             case blocks.BlockType.HEADING:
                 hashtag_count = 0
@@ -22,6 +75,7 @@ def markdown_to_html_node(markdown: str) -> htmlnode.ParentNode:
                     hashtag_count += 1
                 block_node = htmlnode.ParentNode(tag=f'h{hashtag_count}', children=None)
                 text = block[(hashtag_count + 1):]
+                offset = hashtag_count + 1
 
             case blocks.BlockType.CODE:
                 text = block[3:-3].lstrip()
@@ -30,18 +84,9 @@ def markdown_to_html_node(markdown: str) -> htmlnode.ParentNode:
                 return block_node
             
             case blocks.BlockType.QUOTE:
-                # block_node = htmlnode.ParentNode(tag='blockquote', children=None)
-                text = block
-                # line_tag = 'p' 
-                line_markdown = ">"
-
-                # That was the clean way. Now we do it the dumb way.
-                text_list = text.split('\n')   
-                text_list = [text.strip() for text in text_list if text.strip() != ""]
                 cleaned_lines = []
-                for line in text_list:
-                    line = line[line.find(line_markdown) + 1:]
-                    line = line.strip()
+                for line in lines:
+                    line = line[1:].strip() # Every line starts with '>'
                     if line == "":
                         continue
                     cleaned_lines.append(line)
@@ -51,15 +96,15 @@ def markdown_to_html_node(markdown: str) -> htmlnode.ParentNode:
 
             case blocks.BlockType.UNORDERED_LIST:
                 block_node = htmlnode.ParentNode(tag='ul', children=None)
-                text = block
                 line_tag = "li"
-                line_markdown = "-"
+                items = [line[2:] for line in lines]
 
             case blocks.BlockType.ORDERED_LIST:
-                block_node = htmlnode.ParentNode(tag='ol', children=None) # We'll need to add li tags for each entry.
-                text = block
+                start = blocks.ordered_list_start(lines)
+                props = {"start": str(start)} if start != 1 else None
+                block_node = htmlnode.ParentNode(tag='ol', children=None, props=props)
                 line_tag = "li"
-                line_markdown = "."
+                items = [line[line.find(". ") + 2:] for line in lines]
                 
             case _:
                 raise NotImplementedError(f"Unknown block type {block_type}.")
@@ -67,20 +112,20 @@ def markdown_to_html_node(markdown: str) -> htmlnode.ParentNode:
         
         if line_tag is None:
             text = text.replace('\n', ' ')
-            child_text_nodes = text_to_textnodes(text)
+            child_text_nodes = parse_inline(text, block, offset, block_line)
             block_node.children = [text_node_to_html_node(text_node) for text_node in child_text_nodes]
       
-        else:                   # If we have a multiline tag, break it into lines
+        else:                   # If we have a multiline tag, each item becomes a line_tag node
             line_nodes = []
-            text_list = text.split('\n')
-            text_list = [text.strip() for text in text_list if text.strip() != ""]
-            
-            for line in text_list:
-                line = line[line.find(line_markdown) + 1:]
-                line = line.strip()
+            line_offset = 0
+            for block_line_text, item in zip(lines, items):
+                line = item.strip()
+                # Where the item's text starts in the block: past the marker and any spaces.
+                offset = line_offset + len(block_line_text) - len(item.lstrip())
+                line_offset += len(block_line_text) + 1
                 if line == "":
                     continue
-                line_text_nodes = text_to_textnodes(line)
+                line_text_nodes = parse_inline(line, block, offset, block_line)
                 line_html_node = htmlnode.ParentNode(tag=line_tag, children=[text_node_to_html_node(text_node) for text_node in line_text_nodes])
                 line_nodes.append(line_html_node)
             
@@ -88,12 +133,37 @@ def markdown_to_html_node(markdown: str) -> htmlnode.ParentNode:
 
         return block_node 
 
+    def iter_block_nodes(markdown_blocks):
+        for block_line, block in markdown_blocks:
+            if block_cache is None:
+                yield block_to_html_node(block, block_line)
+                continue
+
+            # Each entry keeps the block's link targets too, so a hit still reports them.
+            # Blocks whose URLs do not depend on the page share one entry across pages.
+            resolver_key = url_resolver.key_for(block) if url_resolver is not None else None
+            key = block_cache.key(block, inline_parser, resolver_key)
+            cached = block_cache.get(key)
+            if cached is not None:
+                html, block_links = cached
+                links.extend(block_links)
+            else:
+                start = len(links)
+                html = block_to_html_node(block, block_line).to_html()
+                block_cache.put(key, [html, links[start:]])
+            yield htmlnode.LeafNode(tag=None, value=html)
+
     # ------ markdown_to_html_node function body begins
 
-    markdown_blocks = blocks.markdown_to_blocks(markdown)
-    child_nodes = []
+    lines = markdown.split('\n') if isinstance(markdown, str) else markdown
+    markdown_blocks = blocks.iter_numbered_blocks(lines, first_line)
+    if profiler is not None:
+        markdown_blocks = profiler.timed_iter("block splitting", markdown_blocks)
 
-    for block in markdown_blocks:
-        child_nodes.append(block_to_html_node(block))
-    
-    return htmlnode.ParentNode(tag="div", children=child_nodes)
+    if lazy:
+        children = iter_block_nodes(markdown_blocks)
+        if profiler is not None:
+            # The blocks are parsed as the page is written, so time them apart from serialization.
+            children = profiler.timed_iter("parsing", children)
+        return htmlnode.StreamingParentNode(tag="div", children=children)
+    return htmlnode.ParentNode(tag="div", children=list(iter_block_nodes(markdown_blocks)))
@@ -0,0 +1,98 @@
+import json
+import os
+
+PAGE_INDEX_PATH = ".cache/pages.json"
+
+def page_entry(reader, title: str, path: str) -> dict:
+    """
+    Returns the page index entry for a source that has been read through a SourceReader.
+
+    :param title: The page's title.
+    :param path: The page's site URL, without the base path (e.g. "/blog/tom/").
+    """
+    tags = reader.metadata.get("tags", [])
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(",") if tag.strip() != ""]
+    return {
+        "title": title,
+        "path": path,
+        "date": reader.metadata.get("date"),
+        "tags": tags,
+        "words": reader.words,
+        "hash": reader.hash(),
+    }
+
+def page_path(page_url, dest_path):
+    """
+    Returns the site URL of an output page, without the base path: its directory
+    for an index.html, otherwise the file. None if page_url is None.
+
+    :param page_url: The site URL of the page's directory (see url_resolver.page_url).
+    """
+    if page_url is None:
+        return None
+    file_name = os.path.basename(dest_path)
+    return page_url if file_name == "index.html" else page_url + file_name
+
+class PageIndex:
+    """
+    Metadata for every page on the site, keyed by source path: title, site path,
+    date and tags from the front matter, word count and content hash.
+    Entries are collected while pages render and saved between builds, so pages
+    skipped by an incremental build keep theirs and listings never re-read content.
+    """
+    def __init__(self, path = PAGE_INDEX_PATH, pages = None):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, path = PAGE_INDEX_PATH):
+        try:
+            with open(path, 'r') as index_file:
+                return cls(path, json.load(index_file))
+        except (OSError, ValueError):
+            return cls(path)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w') as index_file:
+            json.dump(self.pages, index_file, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def record(self, source, entry: dict):
+        self.pages[source] = entry
+
+    def retain(self, sources):
+        """
+        Drops the pages that are not in sources, e.g. because they were deleted.
+        """
+        sources = set(sources)
+        self.pages = {source: entry for source, entry in self.pages.items() if source in sources}
+
+    def forget(self, source):
+        self.pages.pop(source, None)
+
+    def newest_first(self, tag = None, section = None) -> list:
+        """
+        Returns the entries, newest date first. Undated pages come last, in path order.
+
+        :param tag: Only return the pages with this tag.
+        :param section: Only return the pages below this site URL, e.g. "/blog/" (not the page at it).
+        """
+        entries = [
+            entry for entry in self.pages.values()
+            if ((tag is None) or (tag in entry["tags"]))
+            and ((section is None) or ((entry["path"] != section) and entry["path"].startswith(section)))
+        ]
+        entries.sort(key=lambda entry: entry["path"])
+        entries.sort(key=lambda entry: entry["date"] or "", reverse=True)
+        return entries
+
+    def tags(self) -> list:
+        return sorted({tag for entry in self.pages.values() for tag in entry["tags"]})
+
+    def __len__(self) -> int:
+        return len(self.pages)
@@ -0,0 +1,96 @@
+import filecmp
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+def read_text(path) -> str:
+    with open(path, 'r') as text_file:
+        return text_file.read()
+
+def file_matches(path, data: bytes) -> bool:
+    """
+    Returns True if the file at path holds exactly data. A size mismatch is
+    caught from the file's metadata, without reading it.
+    """
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        with open(path, 'rb') as existing_file:
+            return existing_file.read() == data
+    except OSError:
+        return False
+
+def files_match(path, other_path) -> bool:
+    """
+    Returns True if both files exist and have the same contents (sizes are compared first).
+    """
+    try:
+        return filecmp.cmp(path, other_path, shallow=False)
+    except OSError:
+        return False
+
+def prefetch(paths, depth = 8, workers = 2):
+    """
+    Reads files in background threads, keeping up to depth reads ahead of the
+    consumer, so waiting on the disk overlaps with parsing the previous file.
+    Yields (path, future) in the order of paths; future.result() is the file's
+    text, or raises the error reading it failed with.
+
+    :param paths: The files to read, in the order they will be used.
+    :param depth: The most files read ahead (and held in memory) at once.
+    :param workers: Number of reader threads.
+    """
+    paths = iter(paths)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        try:
+            for path in paths:
+                pending.append((path, executor.submit(read_text, path)))
+                if len(pending) >= depth:
+                    break
+            while len(pending) > 0:
+                path, future = pending.popleft()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append((next_path, executor.submit(read_text, next_path)))
+                yield path, future
+        finally:
+            # If the build stops early, reads that have not started are dropped.
+            for path, future in pending:
+                future.cancel()
+
+class BackgroundWriter:
+    """
+    Runs page writes in a thread pool while the caller renders the next page.
+    At most max_pending writes are queued or running at once; submit blocks
+    until one finishes, so finished pages never pile up in memory.
+    """
+    def __init__(self, max_pending = 8, workers = 2):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, function, *args):
+        """
+        Schedules function(*args) and returns its Future.
+        """
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(function, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda future: self.slots.release())
+        return future
+
+    def close(self):
+        """
+        Waits for every submitted write to finish.
+        """
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,101 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from static_sync import file_inputs
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt")
+
+def gzip_bytes(data: bytes) -> bytes:
+    # mtime=0 keeps the output deterministic, so unchanged inputs give unchanged .gz files.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def brotli_bytes(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+ENCODINGS = {".gz": gzip_bytes}
+if brotli is not None:
+    ENCODINGS[".br"] = brotli_bytes
+
+def compress_file(path, suffixes):
+    """
+    Writes a compressed sibling of path (path + suffix) for each suffix in suffixes.
+    Each is written to a temporary file first and renamed into place, and gets
+    path's mtime, which marks it as up to date (see sibling_is_current).
+    """
+    with open(path, 'rb') as source_file:
+        data = source_file.read()
+        stat = os.fstat(source_file.fileno())
+    for suffix in suffixes:
+        dest = path + suffix
+        temp_path = dest + ".tmp"
+        with open(temp_path, 'wb') as dest_file:
+            dest_file.write(ENCODINGS[suffix](data))
+        os.utime(temp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(temp_path, dest)
+
+def sibling_is_current(manifest, sibling, inputs) -> bool:
+    if manifest.is_current(sibling, inputs):
+        return True
+    # A full build starts from an empty manifest; a sibling stamped with the file's mtime is still good.
+    try:
+        if os.stat(sibling).st_mtime_ns != inputs["mtime_ns"]:
+            return False
+    except OSError:
+        return False
+    manifest.record(sibling, inputs)
+    return True
+
+def compress_outputs(public_path, manifest, min_size = 1024, workers = None):
+    """
+    Writes .gz (and .br, if the brotli module is installed) siblings for the
+    compressible files under public_path that are at least min_size bytes and were
+    produced by this build (are in manifest.seen). The outputs of deleted sources are
+    still on disk until the orphans are removed, and must not keep their siblings alive.
+    A file is only compressed again if its size or mtime changed since its
+    siblings were recorded in the manifest; unchanged outputs keep their mtime,
+    so this is the same as "its content changed". Siblings of files that were
+    deleted or shrank below min_size become manifest orphans.
+    Compression runs in a thread pool (zlib and brotli release the GIL).
+    Returns (files compressed, files unchanged).
+
+    :param manifest: The BuildManifest to record the compressed files in.
+    :param min_size: Files smaller than this many bytes are served as they are.
+    :param workers: Number of compression threads (default: ThreadPoolExecutor's default).
+    """
+    pending = []
+    unchanged = 0
+    for dir_path, dir_names, file_names in os.walk(public_path):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if not file_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.normpath(os.path.join(dir_path, file_name))
+            if path not in manifest.seen:
+                continue
+            inputs = file_inputs(path)
+            if inputs["size"] < min_size:
+                continue
+            stale = []
+            for suffix in ENCODINGS:
+                # Check every suffix, so each one is marked as produced by this build.
+                if not sibling_is_current(manifest, path + suffix, inputs):
+                    stale.append(suffix)
+            if len(stale) == 0:
+                unchanged += 1
+                continue
+            pending.append((path, stale, inputs))
+
+    if len(pending) > 0:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(compress_file, path, stale) for path, stale, inputs in pending]
+            for (path, stale, inputs), future in zip(pending, futures):
+                future.result()
+                for suffix in stale:
+                    manifest.record(path + suffix, inputs)
+    return len(pending), unchanged
@@ -0,0 +1,137 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+class BuildProfiler:
+    """
+    Collects timings for one build.
+    Coarse stages (static copy, each page, reads, writes...) are kept as events, so
+    they can be exported as a Chrome trace. Fine-grained work that happens thousands
+    of times per page (block and inline parsing) only adds to cumulative totals.
+    """
+    def __init__(self):
+        self.totals = {}
+        self.counts = {}
+        self.events = []
+        self.page_times = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def add(self, name, seconds, count = 1):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + count
+
+    @contextmanager
+    def stage(self, name, page = None):
+        """
+        Times the body of a with statement as stage name, optionally for one page.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.add(name, duration)
+            self.events.append({"name": name, "page": page, "start": start, "duration": duration, "pid": os.getpid()})
+            if name == "page":
+                self.page_times[page] = duration
+
+    def timed(self, name, function):
+        """
+        Wraps function so every call adds to the cumulative total for name.
+        """
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - start)
+        return wrapper
+
+    def timed_iter(self, name, iterable):
+        """
+        Wraps an iterable (e.g. a generator) so the time spent producing each item
+        adds to the cumulative total for name.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.add(name, time.perf_counter() - start)
+            yield item
+
+    def to_dict(self) -> dict:
+        return {
+            "totals": self.totals,
+            "counts": self.counts,
+            "events": self.events,
+            "page_times": self.page_times,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+
+    def merge(self, data: dict):
+        """
+        Adds the timings collected by another profiler (e.g. in a worker process),
+        as returned by its to_dict().
+        """
+        for name, seconds in data["totals"].items():
+            self.add(name, seconds, data["counts"].get(name, 1))
+        self.events.extend(data["events"])
+        self.page_times.update(data["page_times"])
+        self.bytes_read += data["bytes_read"]
+        self.bytes_written += data["bytes_written"]
+
+    def report(self, top = 10) -> str:
+        lines = ["Build profile:", f"  {'stage':<24}{'total (s)':>12}{'calls':>10}{'per call (ms)':>16}"]
+        for name, seconds in sorted(self.totals.items(), key=lambda item: -item[1]):
+            count = self.counts[name]
+            lines.append(f"  {name:<24}{seconds:>12.4f}{count:>10}{seconds / count * 1000:>16.4f}")
+        lines.append(f"  Bytes read: {self.bytes_read}, bytes written: {self.bytes_written}")
+
+        if len(self.page_times) > 0:
+            lines.append(f"  Slowest {min(top, len(self.page_times))} of {len(self.page_times)} pages:")
+            slowest = sorted(self.page_times.items(), key=lambda item: -item[1])[:top]
+            for page, seconds in slowest:
+                lines.append(f"    {seconds * 1000:>10.3f} ms  {page}")
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        """
+        Writes the stage events in Chrome trace-event format (load in chrome://tracing or Perfetto).
+        """
+        origin = min((event["start"] for event in self.events), default=0.0)
+        trace_events = []
+        for event in sorted(self.events, key=lambda event: event["start"]):
+            trace_event = {
+                "name": event["name"],
+                "ph": "X",
+                "ts": (event["start"] - origin) * 1e6,
+                "dur": event["duration"] * 1e6,
+                "pid": event["pid"],
+                "tid": event["pid"],
+            }
+            if event["page"] is not None:
+                trace_event["args"] = {"page": event["page"]}
+            trace_events.append(trace_event)
+        with open(path, 'w') as trace_file:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, trace_file)
+
+class TimedStream:
+    """
+    A write-only wrapper around a text stream that times the writes,
+    so writing can be told apart from serialization.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.seconds = 0.0
+
+    def write(self, text):
+        start = time.perf_counter()
+        self.stream.write(text)
+        self.seconds += time.perf_counter() - start
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from manifest import GENERATOR_VERSION
+
+RENDER_CACHE_PATH = ".cache/render.sqlite"
+# Bump when the pages table changes; an older table is dropped rather than migrated.
+SCHEMA_VERSION = 2
+
+class RenderCache:
+    """
+    A persistent cache of rendered pages: the extract_title result, the article
+    HTML and the page's link targets, keyed by a hash of the markdown, the generator version and the render options.
+    Stored in a single SQLite file, so a CI build can restore it as one artifact.
+    When the cache grows past max_bytes, the least recently used pages are evicted.
+    """
+    def __init__(self, path = RENDER_CACHE_PATH, max_bytes = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        # Worker processes share the file, so wait for locks rather than failing.
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.connection.execute("DROP TABLE IF EXISTS pages")
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " key TEXT PRIMARY KEY, title TEXT NOT NULL, html TEXT NOT NULL, links TEXT NOT NULL,"
+            " size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+
+    def key(self, markdown: str, *options) -> str:
+        digest = hashlib.sha256(GENERATOR_VERSION.encode())
+        for option in options:
+            digest.update(b"\0" + str(option).encode())
+        digest.update(b"\0" + markdown.encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Returns (title, html, links) for key, or None.
+        """
+        row = self.connection.execute("SELECT title, html, links FROM pages WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.connection.execute("UPDATE pages SET last_used = ? WHERE key = ?", (time.time(), key))
+        title, html, links = row
+        return title, html, json.loads(links)
+
+    def put(self, key, title: str, html: str, links = ()):
+        links = json.dumps(list(links))
+        size = len(title) + len(html) + len(links)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO pages (key, title, html, links, size, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, title, html, links, size, time.time()),
+        )
+
+    def size(self) -> int:
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def evict(self) -> int:
+        """
+        Deletes least recently used pages until the cache fits in max_bytes.
+        Returns the number of pages deleted.
+        """
+        excess = self.size() - self.max_bytes
+        if excess <= 0:
+            return 0
+        evicted = 0
+        rows = self.connection.execute("SELECT key, size FROM pages ORDER BY last_used").fetchall()
+        self.connection.execute("BEGIN")
+        for key, size in rows:
+            if excess <= 0:
+                break
+            self.connection.execute("DELETE FROM pages WHERE key = ?", (key,))
+            excess -= size
+            evicted += 1
+        self.connection.execute("COMMIT")
+        return evicted
+
+    def clear(self):
+        self.connection.execute("DELETE FROM pages")
+        self.connection.execute("VACUUM")
+
+    def close(self):
+        self.connection.close()
+
+    def __getstate__(self):
+        raise TypeError("RenderCache cannot be sent to another process; open one per process instead.")
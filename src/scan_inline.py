@@ -0,0 +1,111 @@
+import re
+
+from textnode import TextNode, TextType
+from extract_markdown import IMAGE_PATTERN, LINK_PATTERN
+from source_error import SourceError
+
+# Every character that can start or end an inline element.
+SPECIAL_PATTERN = re.compile(r"[`!\[*_]")
+
+DELIMITER_TYPES = {
+    "**": TextType.BOLD,
+    "*": TextType.ITALIC,
+    "_": TextType.ITALIC,
+}
+
+def _styled_node(children: list, text_type: TextType, url = None) -> TextNode:
+    # A span holding only plain text is emitted flat, exactly as text_to_textnodes would.
+    text = "".join(child.text for child in children)
+    if all(child.text_type == TextType.PLAIN for child in children):
+        return TextNode(text, text_type, url)
+    return TextNode(text, text_type, url, children=children)
+
+def _scan(text: str, pos: int, closer, opened_at = None):
+    """
+    Scans text from pos until closer (or the end of the text if closer is None).
+    opened_at is the position of the matching opening delimiter, for error messages.
+    Returns the nodes found and the position just after the closer.
+    """
+    nodes = []
+    plain_start = pos
+
+    def flush(end):
+        if end > plain_start:
+            nodes.append(TextNode(text[plain_start:end], TextType.PLAIN))
+
+    while True:
+        match = SPECIAL_PATTERN.search(text, pos)
+        if match is None:
+            if closer is not None:
+                break
+            flush(len(text))
+            return nodes, len(text)
+
+        pos = match.start()
+        char = text[pos]
+
+        if (closer is not None) and text.startswith(closer, pos):
+            flush(pos)
+            return nodes, pos + len(closer)
+
+        if char == "`":
+            end = text.find("`", pos + 1)
+            if end == -1:
+                raise SourceError("Unmatched delimiter '`'.", column=pos + 1)
+            flush(pos)
+            if end > pos + 1:
+                nodes.append(TextNode(text[pos + 1:end], TextType.CODE))
+            pos = plain_start = end + 1
+
+        elif char == "!":
+            # The extract_markdown patterns, anchored with match() here and at '[' below.
+            image = IMAGE_PATTERN.match(text, pos)
+            if image is None:
+                pos += 1
+                continue
+            flush(pos)
+            nodes.append(TextNode(text=image.group(1), url=image.group(2), text_type=TextType.IMAGE))
+            pos = plain_start = image.end()
+
+        elif char == "[":
+            link = LINK_PATTERN.match(text, pos)
+            if link is None:
+                pos += 1
+                continue
+            flush(pos)
+            try:
+                children, _ = _scan(link.group(1), 0, None)
+            except SourceError as error:
+                # Columns in the link text, moved to columns in text.
+                raise error.located(None, error.column + link.start(1)) from None
+            if len(children) == 0:
+                nodes.append(TextNode(text="", url=link.group(2), text_type=TextType.LINK))
+            else:
+                nodes.append(_styled_node(children, TextType.LINK, link.group(2)))
+            pos = plain_start = link.end()
+
+        else:
+            delimiter = "**" if text.startswith("**", pos) else char
+            flush(pos)
+            children, pos = _scan(text, pos + len(delimiter), delimiter, pos)
+            if len(children) > 0:
+                nodes.append(_styled_node(children, DELIMITER_TYPES[delimiter]))
+            plain_start = pos
+
+    raise SourceError(f"Unmatched delimiter '{closer}'.", column=opened_at + 1)
+
+def scan_inline(text: str) -> list:
+    """
+    Converts markdown text to TextNodes in a single left-to-right pass.
+    Produces the same nodes as text_to_textnodes for flat markup, and also
+    handles nesting: emphasis inside links and emphasis inside emphasis become
+    TextNodes with children. Code spans and image alt text are taken literally.
+
+    :param text: The markdown text of one paragraph, heading or list item.
+    """
+    nodes, _ = _scan(text, 0, None)
+    return nodes
+
+if __name__ == "__main__":
+    print(scan_inline("This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)"))
+    print(scan_inline("A [**bold** link](https://boot.dev) and **bold _italic_ text**"))
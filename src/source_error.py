@@ -0,0 +1,39 @@
+class SourceError(ValueError):
+    """
+    A problem at a known place in a markdown source.
+    line and column are 1-based, and either may be None if unknown. Parsers that
+    only see part of a file (a block, an inline run of text) report positions
+    within that part; their caller moves the error to file positions with located().
+    """
+    def __init__(self, message: str, line = None, column = None):
+        super().__init__(message)
+        self.message = message
+        self.line = line
+        self.column = column
+
+    def located(self, line, column) -> "SourceError":
+        return SourceError(self.message, line, column)
+
+    def __str__(self) -> str:
+        if self.line is None:
+            return self.message if self.column is None else f"column {self.column}: {self.message}"
+        if self.column is None:
+            return f"line {self.line}: {self.message}"
+        return f"line {self.line}, column {self.column}: {self.message}"
+
+    def __reduce__(self):
+        # Errors travel back from worker processes pickled; keep the position.
+        return (SourceError, (self.message, self.line, self.column))
+
+def error_entry(source, error: Exception) -> dict:
+    """
+    Returns the JSON error report entry for an error while building source.
+    """
+    located = isinstance(error, SourceError)
+    return {
+        "source": str(source),
+        "line": error.line if located else None,
+        "column": error.column if located else None,
+        "type": type(error).__name__,
+        "message": error.message if located else str(error),
+    }
@@ -1,5 +1,9 @@
 from textnode import TextNode, TextType
-from extract_markdown import extract_markdown_images, extract_markdown_links
+from extract_markdown import iter_markdown_images, iter_markdown_links
+from source_error import SourceError
+
+# The delimiters text_to_textnodes splits on, in the order it splits on them.
+DELIMITERS = (("**", TextType.BOLD), ("*", TextType.ITALIC), ("_", TextType.ITALIC), ("`", TextType.CODE))
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     """
@@ -39,7 +43,17 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     
     return new_nodes
 
-def split_nodes_image(old_nodes):
+def split_nodes_matches(old_nodes, iter_matches, text_type):
+    """
+    Splits each PLAIN TextNode around the matches of a markdown pattern, in one pass:
+    the text between matches is sliced out by offset, and each match becomes a
+    TextNode of text_type whose text and URL are the match's two groups.
+
+    Args:
+        old_nodes (list of TextNode): The nodes to split.
+        iter_matches (callable): Returns the matches in a string, e.g. iter_markdown_images.
+        text_type (TextType): The TextType of the nodes created from matches.
+    """
     new_nodes = []
 
     for node in old_nodes:
@@ -47,61 +61,49 @@ def split_nodes_image(old_nodes):
             new_nodes.append(node)
             continue
 
-        images = extract_markdown_images(node.text)
-        if images == []:
-            new_nodes.append(node)
-            continue
+        text = node.text
+        position = 0
+        for match in iter_matches(text):
+            start, end = match.span()
+            if start > position:
+                new_nodes.append(TextNode(text[position:start], TextType.PLAIN))
+            new_nodes.append(TextNode(text=match.group(1), url=match.group(2), text_type=text_type))
+            position = end
 
-        sublist = [node]
-        for image in images:
-            new_sublist = []
-            image_string = f"![{image[0]}]({image[1]})"
-            for subnode in sublist:
-                if image_string in subnode.text:
-                    split_text = subnode.text.split(image_string, maxsplit=1)
-                    if split_text[0] != "":
-                        new_sublist.append(TextNode(split_text[0], TextType.PLAIN))
-                    new_sublist.append(TextNode(text=image[0], url=image[1], text_type=TextType.IMAGE))
-                    if split_text[1] != "":
-                        new_sublist.append(TextNode(split_text[1], TextType.PLAIN))
-                else:
-                    new_sublist.append(subnode)
-            sublist = new_sublist
-        new_nodes.extend(sublist)
+        if position == 0:
+            new_nodes.append(node)
+        elif position < len(text):
+            new_nodes.append(TextNode(text[position:], TextType.PLAIN))
 
     return new_nodes
 
-def split_nodes_link(old_nodes):
-    new_nodes = []
-
-    for node in old_nodes:
-        if node.text_type != TextType.PLAIN:
-            new_nodes.append(node)
-            continue
-
-        links = extract_markdown_links(node.text)
-        if links == []:
-            new_nodes.append(node)
-            continue
+def split_nodes_image(old_nodes):
+    return split_nodes_matches(old_nodes, iter_markdown_images, TextType.IMAGE)
 
-        sublist = [node]
-        for link in links:
-            new_sublist = []
-            link_string = f"[{link[0]}]({link[1]})"
-            for subnode in sublist:
-                if link_string in subnode.text:
-                    split_text = subnode.text.split(link_string, maxsplit=1)
-                    if split_text[0] != "":
-                        new_sublist.append(TextNode(split_text[0], TextType.PLAIN))
-                    new_sublist.append(TextNode(text=link[0], url=link[1], text_type=TextType.LINK))
-                    if split_text[1] != "":
-                        new_sublist.append(TextNode(split_text[1], TextType.PLAIN))
-                else:
-                    new_sublist.append(subnode)
-            sublist = new_sublist
-        new_nodes.extend(sublist)
+def split_nodes_link(old_nodes):
+    return split_nodes_matches(old_nodes, iter_markdown_links, TextType.LINK)
 
-    return new_nodes
+def find_unmatched_delimiter(text: str):
+    """
+    Replays the delimiter passes of text_to_textnodes on offsets into text, and returns
+    (delimiter, 1-based column) for the delimiter the first failing pass could not pair,
+    or None if every pass succeeds. Only called once parsing has failed.
+    """
+    segments = [(0, text)]
+    for delimiter, text_type in DELIMITERS:
+        plain_segments = []
+        for offset, segment in segments:
+            parts = segment.split(delimiter)
+            if len(parts) % 2 == 0:
+                # Pairs are taken from the left, so the last one is left over.
+                return delimiter, offset + segment.rfind(delimiter) + 1
+            position = offset
+            for i, part in enumerate(parts):
+                if i % 2 == 0:
+                    plain_segments.append((position, part))
+                position += len(part) + len(delimiter)
+        segments = plain_segments
+    return None
 
 def text_to_textnodes(text) -> list:
     """
@@ -110,10 +112,15 @@ def text_to_textnodes(text) -> list:
     :param text: The mark
     """
     text_nodes = [TextNode(text, TextType.PLAIN)]
-    text_nodes = split_nodes_delimiter(text_nodes, "**", TextType.BOLD)
-    text_nodes = split_nodes_delimiter(text_nodes, "*", TextType.ITALIC)
-    text_nodes = split_nodes_delimiter(text_nodes, "_", TextType.ITALIC)
-    text_nodes = split_nodes_delimiter(text_nodes, "`", TextType.CODE)
+    try:
+        for delimiter, text_type in DELIMITERS:
+            text_nodes = split_nodes_delimiter(text_nodes, delimiter, text_type)
+    except ValueError as error:
+        located = find_unmatched_delimiter(text)
+        if located is None:
+            raise
+        delimiter, column = located
+        raise SourceError(f"Unmatched delimiter '{delimiter}'.", column=column) from error
     text_nodes = split_nodes_image(text_nodes)
     text_nodes = split_nodes_link(text_nodes)
     return text_nodes
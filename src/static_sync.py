@@ -0,0 +1,92 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest import hash_file
+
+# FICLONE from linux/fs.h: share the source's blocks with the destination (btrfs, XFS, ...).
+FICLONE = 0x40049409
+
+LINK_METHODS = ("copy", "hardlink", "reflink")
+
+def reflink(source, dest):
+    import fcntl
+    with open(source, 'rb') as source_file, open(dest, 'wb') as dest_file:
+        fcntl.ioctl(dest_file.fileno(), FICLONE, source_file.fileno())
+    shutil.copystat(source, dest)
+
+def place_file(source, dest, method = "copy") -> str:
+    """
+    Puts a copy of source at dest, replacing any existing file.
+    Falls back to a plain copy when the filesystem cannot link or clone.
+    Returns the method that was actually used.
+
+    :param method: One of LINK_METHODS.
+    """
+    if os.path.lexists(dest):
+        # Never write through an existing file: it may be a hardlink to the source.
+        os.remove(dest)
+    if method == "hardlink":
+        try:
+            os.link(source, dest)
+            return "hardlink"
+        except OSError:
+            pass
+    elif method == "reflink":
+        try:
+            reflink(source, dest)
+            return "reflink"
+        except (OSError, ImportError):
+            if os.path.exists(dest):
+                os.remove(dest)
+    shutil.copy2(source, dest)
+    return "copy"
+
+def file_inputs(path, use_hash = False) -> dict:
+    # Size and mtime are enough to spot edits without reading every asset each build.
+    if use_hash:
+        return {"source": hash_file(path)}
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def sync_dir(source_dir, dest_dir, manifest, use_hash = False, method = "copy", workers = None):
+    """
+    Copies the files under source_dir to dest_dir, skipping those the manifest
+    says are unchanged, and those whose copy in dest_dir already matches (same size
+    and mtime, or same hash). Files deleted from source_dir show up as manifest orphans.
+    Copies run in a thread pool, since they are dominated by I/O.
+    Returns (files copied, files unchanged).
+
+    :param manifest: The BuildManifest recording what was copied last build.
+    :param use_hash: Compare file contents instead of size and mtime.
+    :param method: How to place files: "copy", "hardlink" or "reflink".
+    :param workers: Number of copy threads (default: ThreadPoolExecutor's default).
+    """
+    pending = []
+    unchanged = 0
+    for dir_path, dir_names, file_names in os.walk(source_dir):
+        dir_names.sort()
+        dest_path = os.path.normpath(os.path.join(dest_dir, os.path.relpath(dir_path, source_dir)))
+        for file_name in sorted(file_names):
+            source = os.path.join(dir_path, file_name)
+            dest = os.path.join(dest_path, file_name)
+            inputs = file_inputs(source, use_hash)
+            if manifest.is_current(dest, inputs):
+                unchanged += 1
+                continue
+            # E.g. a full build, which starts from an empty manifest but keeps dest_dir.
+            if os.path.exists(dest) and (file_inputs(dest, use_hash) == inputs):
+                manifest.record(dest, inputs)
+                unchanged += 1
+                continue
+            os.makedirs(dest_path, exist_ok=True)
+            pending.append((source, dest, inputs))
+
+    if len(pending) > 0:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(place_file, source, dest, method) for source, dest, inputs in pending]
+            for (source, dest, inputs), future in zip(pending, futures):
+                future.result()
+                print(f"Copied {source} to {dest}.")
+                manifest.record(dest, inputs)
+    return len(pending), unchanged
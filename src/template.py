@@ -0,0 +1,149 @@
+import os
+import re
+
+from manifest import hash_file
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+INCLUDE_PATTERN = re.compile(r"\{\{ include ([^\s{}]+) \}\}")
+TEMPLATE_NAME = "template.html"
+
+def apply_base_path(html: str, base_path: str) -> str:
+    """
+    Rewrites root-relative href and src attributes in a piece of HTML so the
+    site can be served from base_path instead of /.
+    """
+    html = html.replace('href="/', f'href="{base_path}')
+    html = html.replace('src="/', f'src="{base_path}')
+    return html
+
+def expand_includes(text: str, path, dependencies: list, including = ()) -> str:
+    """
+    Replaces each {{ include file }} in text with the contents of file, itself
+    expanded. file is relative to the directory of path, the file text came from.
+    Every included file is appended to dependencies (once).
+
+    :param including: The chain of files being expanded, to report include cycles.
+    """
+    def include(match):
+        include_path = os.path.normpath(os.path.join(os.path.dirname(path or ""), match.group(1)))
+        if include_path in including:
+            raise ValueError(f"Template include cycle: {' -> '.join(including + (include_path,))}")
+        with open(include_path, 'r') as include_file:
+            included = include_file.read()
+        if include_path not in dependencies:
+            dependencies.append(include_path)
+        return expand_includes(included, include_path, dependencies, including + (include_path,))
+    return INCLUDE_PATTERN.sub(include, text)
+
+class Template:
+    """
+    A page template split once into static segments and {{ Name }} slots,
+    after {{ include file }} partials are expanded.
+    The base path rewrite is applied to the static segments only, so it never
+    touches the content that is filled in later.
+    dependencies lists the template file and every partial it included.
+    """
+    def __init__(self, text: str, base_path = "/", path = None):
+        self.path = path
+        self.base_path = base_path
+        self.dependencies = [os.path.normpath(path)] if path is not None else []
+        text = expand_includes(text, path, self.dependencies, tuple(self.dependencies))
+        # re.split with one group alternates: segment, slot name, segment, ...
+        parts = PLACEHOLDER_PATTERN.split(text)
+        self.segments = [apply_base_path(segment, base_path) for segment in parts[0::2]]
+        self.slots = parts[1::2]
+
+    @classmethod
+    def from_file(cls, path, base_path = "/"):
+        with open(path, 'r') as template_file:
+            return cls(template_file.read(), base_path, path)
+
+    def render(self, **values) -> str:
+        """
+        Fills each slot from values and returns the page.
+        Slots without a value are left as written in the template.
+
+        :param values: The text for each slot, keyed by slot name (e.g. Title, Content).
+        """
+        pieces = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            pieces.append(values.get(slot, f"{{{{ {slot} }}}}"))
+            pieces.append(segment)
+        return "".join(pieces)
+
+    def write(self, stream, **values):
+        """
+        Writes the page to a text stream segment by segment.
+        A value may be a string or an HTMLNode, which is streamed with write_html
+        instead of being rendered to one big string first.
+
+        :param stream: An open text file or buffer.
+        :param values: The content for each slot, keyed by slot name.
+        """
+        stream.write(self.segments[0])
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values.get(slot, f"{{{{ {slot} }}}}")
+            if isinstance(value, str):
+                stream.write(value)
+            else:
+                value.write_html(stream)
+            stream.write(segment)
+
+    def __repr__(self) -> str:
+        return f"Template({self.path}, {self.base_path}, {self.slots})"
+
+class TemplateSet:
+    """
+    Compiles each template file at most once per build and picks the template
+    for each page: the nearest template.html in the page's directory or one of
+    its parents, up to content_path, or else the default template.
+    """
+    def __init__(self, default_path, base_path = "/", content_path = None):
+        self.default_path = default_path
+        self.base_path = base_path
+        self.content_path = os.path.normpath(content_path) if content_path is not None else None
+        self.templates = {}
+        self.by_directory = {}
+        self.hashes = {}
+
+    def load(self, path) -> Template:
+        template = self.templates.get(path)
+        if template is None:
+            template = Template.from_file(path, self.base_path)
+            self.templates[path] = template
+        return template
+
+    def path_for(self, source_path) -> str:
+        directory = os.path.dirname(os.path.normpath(source_path))
+        if self.content_path is None:
+            return self.default_path
+        visited = []
+        path = self.default_path
+        while True:
+            if directory in self.by_directory:
+                path = self.by_directory[directory]
+                break
+            visited.append(directory)
+            candidate = os.path.join(directory, TEMPLATE_NAME)
+            if os.path.isfile(candidate):
+                path = candidate
+                break
+            if (directory == self.content_path) or (directory in ("", os.sep)):
+                break
+            directory = os.path.dirname(directory)
+        for directory in visited:
+            self.by_directory[directory] = path
+        return path
+
+    def template_for(self, source_path) -> Template:
+        return self.load(self.path_for(source_path))
+
+    def dependency_hashes(self, template: Template) -> dict:
+        """
+        Returns {file: content hash} for the template and each of its partials,
+        so a page's manifest entry records exactly the files it depends on.
+        """
+        for path in template.dependencies:
+            if path not in self.hashes:
+                self.hashes[path] = hash_file(path)
+        return {path: self.hashes[path] for path in template.dependencies}
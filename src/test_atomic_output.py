@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import atomic_output
+from atomic_output import stage_output, staging_path, swap_into_place
+from main import write_page
+from template import Template
+
+class TestAtomicOutput(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.temp_dir.name, "docs")
+        os.makedirs(os.path.join(self.public, "blog"))
+        self.write(os.path.join(self.public, "index.html"), "old home")
+        self.write(os.path.join(self.public, "blog", "index.html"), "old blog")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, path, text):
+        with open(path, 'w') as file:
+            file.write(text)
+
+    def read(self, path) -> str:
+        with open(path, 'r') as file:
+            return file.read()
+
+    def test_stage_output_links_files(self):
+        os.makedirs(staging_path(self.public))
+        self.write(os.path.join(staging_path(self.public), "leftover.html"), "crashed build")
+        staging = stage_output(self.public)
+        self.assertEqual(sorted(os.listdir(staging)), ["blog", "index.html"])
+        self.assertTrue(os.path.samefile(os.path.join(staging, "blog", "index.html"), os.path.join(self.public, "blog", "index.html")))
+
+    def test_writes_do_not_reach_the_live_site(self):
+        staging = stage_output(self.public)
+        write_page(Template("{{ Content }}"), os.path.join(staging, "index.html"), "Home", "new home")
+        self.assertEqual(self.read(os.path.join(self.public, "index.html")), "old home")
+        self.assertEqual(self.read(os.path.join(staging, "index.html")), "new home")
+
+    def test_swap_into_place(self):
+        staging = stage_output(self.public)
+        write_page(Template("{{ Content }}"), os.path.join(staging, "index.html"), "Home", "new home")
+        self.assertEqual(self.read(os.path.join(self.public, "index.html")), "old home")
+        swap_into_place(staging, self.public)
+        self.assertEqual(self.read(os.path.join(self.public, "index.html")), "new home")
+        self.assertEqual(self.read(os.path.join(self.public, "blog", "index.html")), "old blog")
+        self.assertEqual(os.listdir(self.temp_dir.name), ["docs"])
+
+    def test_swap_falls_back_to_renames(self):
+        staging = stage_output(self.public)
+        write_page(Template("{{ Content }}"), os.path.join(staging, "index.html"), "Home", "new home")
+        self.assertEqual(self.read(os.path.join(self.public, "index.html")), "old home")
+        with mock.patch.object(atomic_output, "exchange_directories", return_value=False):
+            self.assertFalse(swap_into_place(staging, self.public))
+        self.assertEqual(self.read(os.path.join(self.public, "index.html")), "new home")
+        self.assertEqual(os.listdir(self.temp_dir.name), ["docs"])
+
+if __name__ == "__main__":
+    unittest.main()
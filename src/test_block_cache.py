@@ -0,0 +1,72 @@
+import tempfile
+import unittest
+
+from block_cache import BlockCache
+from markdown_to_html_node import markdown_to_html_node
+from url_resolver import UrlResolver
+
+class TestBlockCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = BlockCache(max_entries=2)
+        cache.put("a", "<p>a</p>")
+        cache.put("b", "<p>b</p>")
+        cache.get("a")
+        cache.put("c", "<p>c</p>")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "<p>a</p>")
+
+    def test_key_depends_on_options(self):
+        cache = BlockCache()
+        self.assertEqual(cache.key("block", "split", "/"), cache.key("block", "split", "/"))
+        self.assertNotEqual(cache.key("block", "split", "/"), cache.key("block", "scan", "/"))
+        self.assertNotEqual(cache.key("block", "split", "/"), cache.key("block", "split", "/base/"))
+
+    def test_disk_store_shared(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            BlockCache(directory=temp_dir).put("abcd", "<p>x</p>")
+            cache = BlockCache(directory=temp_dir)
+            self.assertEqual(cache.get("abcd"), "<p>x</p>")
+            self.assertEqual(cache.hits, 1)
+
+    def test_markdown_to_html_node_with_cache(self):
+        md = "# Title\n\nThe **same** footer\n\n- [Home](/)\n\nThe **same** footer"
+        cache = BlockCache()
+        resolver = UrlResolver("/site/").for_page("/")
+        expected = markdown_to_html_node(md, url_resolver=resolver).to_html()
+        self.assertIn('href="/site/"', expected)
+        self.assertEqual(markdown_to_html_node(md, url_resolver=resolver, block_cache=cache).to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        self.assertEqual(markdown_to_html_node(md, url_resolver=resolver, block_cache=cache).to_html(), expected)
+        self.assertEqual(cache.hits, 5)
+
+    def test_cached_blocks_keep_links(self):
+        md = "[Home](/)\n\n![Tom](/images/tom.png)"
+        cache = BlockCache()
+        markdown_to_html_node(md, block_cache=cache)
+        links = []
+        markdown_to_html_node(md, block_cache=cache, links=links)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(links, ["/", "/images/tom.png"])
+
+    def test_cache_is_per_page_resolver(self):
+        md = "[Next](next.md)"
+        cache = BlockCache()
+        urls = UrlResolver("/")
+        first = markdown_to_html_node(md, url_resolver=urls.for_page("/a/"), block_cache=cache).to_html()
+        second = markdown_to_html_node(md, url_resolver=urls.for_page("/b/"), block_cache=cache).to_html()
+        self.assertEqual(first, '<div><p><a href="/a/next.html">Next</a></p></div>')
+        self.assertEqual(second, '<div><p><a href="/b/next.html">Next</a></p></div>')
+
+    def test_footer_shared_across_pages(self):
+        footer = "Back [home](/) or to [the top](#top)"
+        cache = BlockCache()
+        urls = UrlResolver("/site/")
+        first = markdown_to_html_node(f"# A\n\n{footer}", url_resolver=urls.for_page("/a/"), block_cache=cache).to_html()
+        second = markdown_to_html_node(f"# B\n\n{footer}", url_resolver=urls.for_page("/b/"), block_cache=cache).to_html()
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        self.assertIn('<a href="/site/">home</a>', second)
+        self.assertEqual(first.split("</h1>")[1], second.split("</h1>")[1])
+
+if __name__ == "__main__":
+    unittest.main()
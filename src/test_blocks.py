@@ -1,8 +1,10 @@
+import io
 import unittest
 
-from blocks import BlockType, markdown_to_blocks, block_to_block_type
+from blocks import BlockType, markdown_to_blocks, block_to_block_type, classify_block, iter_blocks, iter_numbered_blocks
+from source_error import SourceError
 from markdown_to_html_node import markdown_to_html_node
-from extract_title import extract_title
+from extract_title import extract_title, extract_title_from_lines
 
 class TestBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -32,6 +34,16 @@ This is the same paragraph on a new line
             ["Whitespace is neat.", "Let's add a bunch!"]
         )
 
+    def test_markdown_to_blocks_fenced_blank_lines(self):
+        md = "Intro\n\n```\nfirst\n\nsecond\n```\n\nOutro"
+        self.assertEqual(markdown_to_blocks(md), ["Intro", "```\nfirst\n\nsecond\n```", "Outro"])
+
+    def test_iter_blocks_from_file(self):
+        md_file = io.StringIO("# Title\n\nLine one\nline two\n\n\n- item\n")
+        blocks = iter_blocks(md_file)
+        self.assertEqual(next(blocks), "# Title")
+        self.assertEqual(list(blocks), ["Line one\nline two", "- item"])
+
     def test_markdown_to_blocks_empty(self):
         md = ""
         blocks = markdown_to_blocks(md)
@@ -118,7 +130,9 @@ This is the same paragraph on a new line
             "1. is the loneliest number",
             "1. Nothing wrong with me\n2. Nothing wrong with me\n3. Nothing wrong with me\n4. Nothing wrong with me",
             "1. ", # The spec does no require anything after the space
-
+            "2. Who needs 1?", # Lists may start at any number
+            "7. Seven\n8. Eight\n9. Nine\n10. Ten",
+            "\n".join(f"{i}. Item" for i in range(1, 301)),
         ]
         bad_blocks = [
             "0. Arrays start at 0\n 1. You silly goose!",
@@ -127,7 +141,6 @@ This is the same paragraph on a new line
             "1. No space\n2.but later!",
             "1.", # It does, however, require the space
             "1. Wouldn't it be better\n2. to use one symbol\n4. number every time?\n3. instead of typing the",
-            "2. Who needs 1?",
             "1. An honest mistake 2. But it needs to break \n3. For the program's sake",
         ]
 
@@ -136,6 +149,15 @@ This is the same paragraph on a new line
         for block in bad_blocks:
             self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
+    def test_classify_block_returns_lines(self):
+        block_type, lines = classify_block("- a\n- b")
+        self.assertEqual(block_type, BlockType.UNORDERED_LIST)
+        self.assertEqual(lines, ["- a", "- b"])
+
+    def test_ordered_list_start(self):
+        md = "3. Three\n4. Four"
+        self.assertEqual(markdown_to_html_node(md).to_html(), '<div><ol start="3"><li>Three</li><li>Four</li></ol></div>')
+
     def test_paragraphs(self):
         md = """
 This is **bolded** paragraph
@@ -206,6 +228,17 @@ the **same** even with inline stuff
             "<div><h1>First heading</h1><h2>Second heading</h2><h3>Third heading</h3><h4>Fourth heading</h4><h5>Fifth heading</h5><h6>Sixth heading</h6><blockquote><p>Where are we heading anyway?</p></blockquote></div>",
         )
         
+    def test_lazy_matches_eager(self):
+        md = "# Heading\n\nSome **bold** text\n\n```\ncode\n\nblock\n```\n\n1. one\n2. two"
+        eager = markdown_to_html_node(md).to_html()
+        lazy = markdown_to_html_node(io.StringIO(md), lazy=True)
+        self.assertEqual("".join(lazy.iter_html()), eager)
+
+    def test_extract_title_from_lines_stops_early(self):
+        lines = iter(["# First", "never read"])
+        self.assertEqual(extract_title_from_lines(lines), "First")
+        self.assertEqual(next(lines), "never read")
+
     def test_extract_title(self):
         md = "# I'm a little program\n# Short and stout\n# Here is my input\n# Here is my out."
 
@@ -221,6 +254,34 @@ the **same** even with inline stuff
         with self.assertRaises(Exception):
             title = extract_title(md)
 
+    def test_iter_numbered_blocks(self):
+        md = "# Title\n\n\nFirst line\nsecond line\n\n```\ncode\n\nmore\n```\n\n- item"
+        self.assertEqual(
+            [line for line, block in iter_numbered_blocks(md.split("\n"), 4)],
+            [4, 7, 10, 16],
+        )
+
+    def test_inline_error_positions(self):
+        cases = [
+            ("# Title\n\nSome text\nand *more", 4, 5),
+            ("## A **heading", 1, 6),
+            ("- one\n-   two `three", 2, 9),
+            ("1. one\n2. two _three", 2, 8),
+        ]
+        for md, line, column in cases:
+            for inline_parser in ("split", "scan"):
+                with self.assertRaises(SourceError) as context:
+                    markdown_to_html_node(md, inline_parser)
+                self.assertEqual((context.exception.line, context.exception.column), (line, column), (md, inline_parser))
+        with self.assertRaises(SourceError) as context:
+            markdown_to_html_node("text _here", first_line=5)
+        self.assertEqual(str(context.exception), "line 5, column 6: Unmatched delimiter '_'.")
+
+    def test_extract_title_missing_line(self):
+        with self.assertRaises(SourceError) as context:
+            extract_title("no title", 4)
+        self.assertEqual(context.exception.line, 4)
+
     def test_extract_title_late(self):
         md = ("Wait for it\n"
               + "#Waait for it\n"
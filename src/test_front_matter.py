@@ -0,0 +1,44 @@
+import hashlib
+import unittest
+
+from front_matter import SourceReader, parse_front_matter
+
+class TestFrontMatter(unittest.TestCase):
+    def test_parse(self):
+        markdown = "---\ntitle: \"Tom: a mistake\"\ndate: 2024-03-01\ntags: [tolkien, opinion]\nauthors:\n  - Sam\n  - 'Frodo'\n# comment\n---\n# Tom\n\nText\n"
+        metadata, body = parse_front_matter(markdown)
+        self.assertEqual(metadata, {
+            "title": "Tom: a mistake",
+            "date": "2024-03-01",
+            "tags": ["tolkien", "opinion"],
+            "authors": ["Sam", "Frodo"],
+        })
+        self.assertEqual(body, "# Tom\n\nText\n")
+
+    def test_no_front_matter(self):
+        markdown = "# Tom\n\n---\n\nText"
+        self.assertEqual(parse_front_matter(markdown), ({}, markdown))
+
+    def test_unclosed(self):
+        with self.assertRaises(ValueError):
+            parse_front_matter("---\ntitle: x\n# Tom\n")
+
+    def test_bad_line(self):
+        with self.assertRaises(ValueError) as context:
+            parse_front_matter("---\ntitle: x\njust text\n---\n")
+        self.assertIn("line 3", str(context.exception))
+
+    def test_body_line(self):
+        self.assertEqual(SourceReader(["---\n", "a: b\n", "c: d\n", "---\n", "# Tom\n"]).body_line, 5)
+        self.assertEqual(SourceReader(["# Tom\n"]).body_line, 1)
+
+    def test_reader_counts_words_and_hashes(self):
+        markdown = "---\ntitle: x y z\n---\n# Tom Bombadil\n\nOld Tom is **merry**.\n"
+        reader = SourceReader(markdown.splitlines(keepends=True))
+        self.assertEqual(reader.words, 0)
+        reader.read_all()
+        self.assertEqual(reader.words, 7)
+        self.assertEqual(reader.hash(), hashlib.sha256(markdown.encode()).hexdigest())
+
+if __name__ == "__main__":
+    unittest.main()
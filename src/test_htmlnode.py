@@ -1,5 +1,7 @@
 import unittest
 
+import io
+
 from htmlnode import HTMLNode, LeafNode, ParentNode, NonClosingLeafNode
 
 
@@ -87,3 +89,27 @@ class TestHTMLNode(unittest.TestCase):
         parent = ParentNode("div", [child1, child2])
         expected_html = "<div><span><i>grandchild1</i><img src=\"pic.png\" /></span><a>child2</a></div>"
         self.assertEqual(parent.to_html(), expected_html)
+
+    def test_iter_html_matches_to_html(self):
+        grandchild = LeafNode("i", "grandchild")
+        child = ParentNode("span", [grandchild, NonClosingLeafNode("img", props={"src": "pic.png"})], {"class": "c"})
+        parent = ParentNode("div", [child, LeafNode(None, "tail")])
+        self.assertEqual("".join(parent.iter_html()), parent.to_html())
+
+    def test_write_html(self):
+        parent = ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")])
+        stream = io.StringIO()
+        parent.write_html(stream)
+        self.assertEqual(stream.getvalue(), "<p><b>Bold</b> text</p>")
+
+    def test_iter_html_deep_tree(self):
+        node = LeafNode(None, "x")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertEqual(len(html), 1 + 5000 * len("<span></span>"))
+
+    def test_iter_html_invalid_child(self):
+        parent = ParentNode("div", [ParentNode("span", [])])
+        with self.assertRaises(ValueError):
+            list(parent.iter_html())
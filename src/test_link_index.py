@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+
+from link_index import LinkIndex, target_exists
+
+OUTPUTS = ["docs/index.html", "docs/blog/tom/index.html", "docs/images/tom.png", "docs/index.css"]
+
+class TestLinkIndex(unittest.TestCase):
+    def test_target_exists(self):
+        existing = {os.path.normpath(path) for path in OUTPUTS}
+        for target in ("/", "/blog/tom", "/blog/tom/", "/images/tom.png#x", "/index.css?v=1", "https://www.boot.dev", "#top"):
+            self.assertTrue(target_exists(target, existing, "docs/"), target)
+        for target in ("/blog/nope", "/images/tom.png/", "/images/cat.png"):
+            self.assertFalse(target_exists(target, existing, "docs/"), target)
+
+    def test_base_path(self):
+        existing = {os.path.normpath(path) for path in OUTPUTS}
+        self.assertTrue(target_exists("/site/blog/tom/", existing, "docs/", "/site/"))
+        self.assertFalse(target_exists("/blog/tom/", existing, "docs/", "/site/"))
+
+    def test_broken(self):
+        index = LinkIndex()
+        index.record("content/index.md", ["/blog/tom", "/blog/nope", "https://www.boot.dev"])
+        index.record("content/blog/tom/index.md", ["/", "/images/cat.png", "/blog/nope"])
+        self.assertEqual(index.broken(OUTPUTS, "docs/"), [
+            ("content/blog/tom/index.md", "/images/cat.png"),
+            ("content/blog/tom/index.md", "/blog/nope"),
+            ("content/index.md", "/blog/nope"),
+        ])
+
+    def test_retain_and_round_trip(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "cache", "links.json")
+            index = LinkIndex(path)
+            index.record("content/a.md", ["/b"])
+            index.record("content/b.md", ["/a"])
+            index.retain(["content/a.md"])
+            index.save()
+            self.assertEqual(LinkIndex.load(path).pages, {"content/a.md": ["/b"]})
+
+if __name__ == "__main__":
+    unittest.main()
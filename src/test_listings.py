@@ -0,0 +1,69 @@
+import unittest
+
+from listings import ListingPage, TAGS_URL, listing_url, paginate, plan_listings, slugify
+from page_index import PageIndex
+
+def entry(path, date = None, tags = ()):
+    return {"title": path.strip("/"), "path": path, "date": date, "tags": list(tags), "words": 1, "hash": "x"}
+
+class TestListings(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("Middle-earth Lore"), "middle-earth-lore")
+        self.assertEqual(slugify("C++"), "c")
+        self.assertEqual(slugify("!!"), "tag")
+
+    def test_listing_url_and_paginate(self):
+        self.assertEqual(listing_url("/blog/", 1), "/blog/")
+        self.assertEqual(listing_url("/blog/", 3), "/blog/page/3/")
+        self.assertEqual(paginate([1, 2, 3, 4, 5], 2), [[1, 2], [3, 4], [5]])
+        self.assertEqual(paginate([], 2), [])
+
+    def test_plan_listings(self):
+        index = PageIndex()
+        index.record("index.md", entry("/"))
+        index.record("a.md", entry("/blog/a/", "2024-01-01", ["Tolkien"]))
+        index.record("b.md", entry("/blog/b/", "2024-03-01", ["Tolkien", "film"]))
+        index.record("c.md", entry("/blog/c/", "2024-02-01"))
+        index.record("contact.md", entry("/contact/", "2025-01-01", ["film"]))
+        listings = plan_listings(index, "/blog/", 2)
+        self.assertEqual(
+            [(listing.url, [page["path"] for page in listing.entries]) for listing in listings],
+            [
+                ("/blog/", ["/blog/b/", "/blog/c/"]),
+                ("/blog/page/2/", ["/blog/a/"]),
+                ("/tags/tolkien/", ["/blog/b/", "/blog/a/"]),
+                ("/tags/film/", ["/contact/", "/blog/b/"]),
+                (TAGS_URL, ["/tags/tolkien/", "/tags/film/"]),
+            ],
+        )
+        self.assertEqual(listings[1].title, "Blog (page 2)")
+
+    def test_plan_listings_rejects_clashes(self):
+        index = PageIndex()
+        index.record("blog.md", entry("/blog/"))
+        index.record("a.md", entry("/blog/a/"))
+        with self.assertRaises(ValueError):
+            plan_listings(index, "/blog/")
+        index = PageIndex()
+        index.record("a.md", entry("/a/", tags=["C++", "c"]))
+        with self.assertRaises(ValueError):
+            plan_listings(index, "/blog/")
+
+    def test_to_html_node(self):
+        listing = ListingPage("/blog/page/2/", "Blog (page 2)", [entry("/blog/a/", "2024-01-01"), entry("/blog/b/")], 2, 2, "/blog/")
+        html = listing.to_html_node(lambda url: "/site" + url).to_html()
+        self.assertEqual(
+            html,
+            '<div><h1>Blog (page 2)</h1><ul class="listing">'
+            '<li><a href="/site/blog/a/">blog/a</a> <time datetime="2024-01-01">2024-01-01</time></li>'
+            '<li><a href="/site/blog/b/">blog/b</a></li></ul>'
+            '<nav class="pagination"><a href="/site/blog/" rel="prev">Newer</a><span>Page 2 of 2</span></nav></div>',
+        )
+
+    def test_key_ignores_content(self):
+        first = ListingPage("/blog/", "Blog", [entry("/blog/a/")], 1, 1, "/blog/")
+        edited = dict(entry("/blog/a/"), words=500, hash="y")
+        self.assertEqual(first.key(), ListingPage("/blog/", "Blog", [edited], 1, 1, "/blog/").key())
+
+if __name__ == "__main__":
+    unittest.main()
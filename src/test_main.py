@@ -0,0 +1,265 @@
+import io
+import os
+import json
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+from contextlib import redirect_stdout
+
+from main import BuildError, _render_page, collect_pages, generate_page, generate_pages_in_dir, generate_listing_pages, render_page, write_error_report, write_page
+from source_error import SourceError
+from template import Template
+from manifest import BuildManifest
+from page_index import PageIndex
+
+def write_site(root, pages):
+    for path, text in pages.items():
+        path = os.path.join(root, "content", path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(text)
+    with open(os.path.join(root, "template.html"), 'w') as file:
+        file.write("<title>{{ Title }}</title><body>{{ Content }}</body>")
+
+def read_tree(root) -> dict:
+    tree = {}
+    for dir_path, dir_names, file_names in os.walk(root):
+        for file_name in file_names:
+            path = os.path.join(dir_path, file_name)
+            with open(path, 'r') as file:
+                tree[os.path.relpath(path, root)] = file.read()
+    return tree
+
+class TestMain(unittest.TestCase):
+    def test_collect_pages(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            content = os.path.join(temp_dir, "content")
+            os.makedirs(os.path.join(content, "blog", "b"))
+            os.makedirs(os.path.join(content, "blog", "a"))
+            for path in ["index.md", "notes.txt", "blog/b/index.md", "blog/a/index.md"]:
+                with open(os.path.join(content, path), 'w') as file:
+                    file.write("# Title")
+
+            pages = collect_pages(content, "docs")
+            self.assertEqual(
+                pages,
+                [
+                    (os.path.join(content, "index.md"), os.path.join("docs", "index.html")),
+                    (os.path.join(content, "blog", "a", "index.md"), os.path.join("docs", "blog", "a", "index.html")),
+                    (os.path.join(content, "blog", "b", "index.md"), os.path.join("docs", "blog", "b", "index.html")),
+                ],
+            )
+
+    def test_write_page_skips_identical(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "index.html")
+            self.assertTrue(write_page(template, path, "Hi", "<p>x</p>"))
+            os.utime(path, ns=(0, 0))
+            self.assertFalse(write_page(template, path, "Hi", "<p>x</p>"))
+            self.assertEqual(os.stat(path).st_mtime_ns, 0)
+            self.assertTrue(write_page(template, path, "Hi", "<p>y</p>"))
+            with open(path, 'r') as file:
+                self.assertEqual(file.read(), "<title>Hi</title><p>y</p>")
+            self.assertEqual(os.listdir(temp_dir), ["index.html"])
+
+    def test_generate_page_reads_source_once(self):
+        sources = {
+            "front_matter.md": "---\ntitle: From front matter\n---\n# Heading\n\nText with *emphasis*.\n",
+            "late_title.md": "Some text first.\n\n# The Title\n\nMore text.\n",
+        }
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name, markdown in sources.items():
+                source_path = os.path.join(temp_dir, name)
+                with open(source_path, 'w') as file:
+                    file.write(markdown)
+                dest_path = os.path.join(temp_dir, name[:-3] + ".html")
+                with mock.patch("builtins.open", wraps=open) as opened:
+                    with redirect_stdout(io.StringIO()):
+                        links, written, entry = generate_page("/", source_path, template, dest_path)
+                self.assertEqual([call.args[0] for call in opened.call_args_list].count(source_path), 1, name)
+
+                title, content, links, source = render_page(markdown)
+                with open(dest_path, 'r') as file:
+                    self.assertEqual(file.read(), template.render(Title=title, Content=content), name)
+                self.assertEqual((entry["title"], entry["words"], entry["hash"]), (title, source.words, source.hash()), name)
+
+    def test_rebuild_reports_unchanged_pages(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_site(temp_dir, {"index.md": "# Home", "a/index.md": "# A\n\ntext"})
+            content = os.path.join(temp_dir, "content")
+            template = os.path.join(temp_dir, "template.html")
+            docs = os.path.join(temp_dir, "docs")
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(generate_pages_in_dir("/", content, template, docs), (2, 0))
+                with open(os.path.join(content, "a", "index.md"), 'a') as file:
+                    file.write(" more")
+                self.assertEqual(generate_pages_in_dir("/", content, template, docs), (1, 1))
+                self.assertEqual(generate_pages_in_dir("/", content, template, docs, io_queue_size=2), (0, 2))
+
+    def test_background_io_matches_inline(self):
+        pages = {f"blog/{i}/index.md": f"# Post {i}\n\nSee [home](/) and [next](../{i + 1}/)." for i in range(12)}
+        pages["index.md"] = "# Home\n\n- [First](/blog/0/)"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_site(temp_dir, pages)
+            content = os.path.join(temp_dir, "content")
+            template = os.path.join(temp_dir, "template.html")
+            inline = os.path.join(temp_dir, "inline")
+            background = os.path.join(temp_dir, "background")
+            manifest = BuildManifest(os.path.join(temp_dir, "manifest.json"))
+            with redirect_stdout(io.StringIO()):
+                generate_pages_in_dir("/site/", content, template, inline)
+                generate_pages_in_dir("/site/", content, template, background, manifest, io_queue_size=3)
+            self.assertEqual(len(read_tree(inline)), 13)
+            self.assertEqual(read_tree(background), read_tree(inline))
+            self.assertEqual(len(manifest.entries), 13)
+
+    def test_parallel_progress_in_page_order(self):
+        pages = {f"blog/{i}/index.md": f"# Post {i}" for i in range(12)}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_site(temp_dir, pages)
+            content = os.path.join(temp_dir, "content")
+            template = os.path.join(temp_dir, "template.html")
+            docs = os.path.join(temp_dir, "docs")
+            output = io.StringIO()
+            with redirect_stdout(output):
+                generate_pages_in_dir("/", content, template, docs, jobs=2)
+            progress = [line.split()[3] for line in output.getvalue().splitlines() if line.startswith("Generating page")]
+            self.assertEqual(progress, [source for source, dest in collect_pages(content, docs)])
+
+            # Workers print nothing themselves.
+            output = io.StringIO()
+            with redirect_stdout(output):
+                error = _render_page(("/", os.path.join(content, "blog", "0", "index.md"), template, os.path.join(docs, "blog", "0", "index.html"), "/blog/0/", "split", False, None, None))[0]
+            self.assertIsNone(error)
+            self.assertEqual(output.getvalue(), "")
+
+    def test_listings_only_rewrite_changed_slices(self):
+        pages = {f"blog/{i}/index.md": f"---\ndate: 2024-01-{i + 10}\ntags: [news]\n---\n# Post {i}" for i in range(5)}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_site(temp_dir, pages)
+            content = os.path.join(temp_dir, "content")
+            template = os.path.join(temp_dir, "template.html")
+            docs = os.path.join(temp_dir, "docs")
+            manifest = BuildManifest(os.path.join(temp_dir, "manifest.json"))
+            index = PageIndex()
+            with redirect_stdout(io.StringIO()):
+                generate_pages_in_dir("/site/", content, template, docs, manifest, page_index=index)
+                # blog/ 1 and 2, tags/news/ 1 and 2, tags/
+                self.assertEqual(generate_listing_pages("/site/", index, content, template, docs, manifest, page_size=3), (5, 0))
+                with open(os.path.join(docs, "blog", "index.html"), 'r') as file:
+                    first = file.read()
+                self.assertIn('<a href="/site/blog/4/">Post 4</a>', first)
+                self.assertIn('<a href="/site/blog/page/2/" rel="next">Older</a>', first)
+
+                # A body edit changes no listing slice.
+                with open(os.path.join(content, "blog", "0", "index.md"), 'a') as file:
+                    file.write("\n\nMore text.")
+                generate_pages_in_dir("/site/", content, template, docs, manifest, page_index=index)
+                self.assertEqual(generate_listing_pages("/site/", index, content, template, docs, manifest, page_size=3), (0, 5))
+                with open(os.path.join(content, "blog", "0", "index.md"), 'w') as file:
+                    file.write("---\ndate: 2024-01-10\n---\n# Post 0")
+                # Untagging a post rewrites the last news page and the tag counts, not the blog.
+                generate_pages_in_dir("/site/", content, template, docs, manifest, page_index=index)
+                self.assertEqual(generate_listing_pages("/site/", index, content, template, docs, manifest, page_size=3), (2, 3))
+                # With two posts gone every listing fits on one page, and the second pages are removed.
+                for i in range(2):
+                    os.remove(os.path.join(content, "blog", str(i), "index.md"))
+                generate_pages_in_dir("/site/", content, template, docs, manifest, page_index=index)
+                self.assertEqual(generate_listing_pages("/site/", index, content, template, docs, manifest, page_size=3), (3, 0))
+                self.assertFalse(os.path.exists(os.path.join(docs, "blog", "page")))
+                self.assertFalse(os.path.exists(os.path.join(docs, "tags", "news", "page", "2")))
+
+    def test_keep_going_reports_every_failure(self):
+        pages = {
+            "index.md": "# Home",
+            "a/index.md": "# A\n\nan *unclosed",
+            "b/index.md": "no title",
+            "c/index.md": "# C",
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_site(temp_dir, pages)
+            content = os.path.join(temp_dir, "content")
+            template = os.path.join(temp_dir, "template.html")
+            for options in [{}, {"io_queue_size": 2}, {"jobs": 2}]:
+                docs = os.path.join(temp_dir, "docs")
+                with redirect_stdout(io.StringIO()):
+                    with self.assertRaises(BuildError) as fail_fast:
+                        generate_pages_in_dir("/", content, template, docs, **options)
+                    with self.assertRaises(BuildError) as keep_going:
+                        generate_pages_in_dir("/", content, template, docs, keep_going=True, **options)
+                # Pages that were already rendering when the first one failed may be reported too.
+                self.assertEqual(fail_fast.exception.failures[0][0], os.path.join(content, "a", "index.md"), options)
+                self.assertEqual(
+                    [(entry["source"], entry["line"], entry["column"]) for entry in keep_going.exception.report()],
+                    [(os.path.join(content, "a", "index.md"), 3, 4), (os.path.join(content, "b", "index.md"), 1, None)],
+                )
+                self.assertTrue(os.path.exists(os.path.join(docs, "c", "index.html")))
+
+    def test_template_errors_are_page_failures(self):
+        pages = {
+            "index.md": "# Home",
+            "blog/index.md": "---\ndate: 2024-01-01\n---\n# Blog",
+            "blog/post/index.md": "---\ndate: 2024-01-02\n---\n# Post",
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_site(temp_dir, pages)
+            content = os.path.join(temp_dir, "content")
+            template = os.path.join(temp_dir, "template.html")
+            with open(os.path.join(content, "blog", "template.html"), 'w') as file:
+                file.write("{{ include missing.html }}{{ Content }}")
+            for options in [{}, {"io_queue_size": 2}, {"jobs": 2}]:
+                docs = os.path.join(temp_dir, "docs")
+                with redirect_stdout(io.StringIO()):
+                    with self.assertRaises(BuildError) as fail_fast:
+                        generate_pages_in_dir("/", content, template, docs, **options)
+                    manifest = BuildManifest(os.path.join(temp_dir, "manifest.json"))
+                    index = PageIndex()
+                    with self.assertRaises(BuildError) as keep_going:
+                        generate_pages_in_dir("/", content, template, docs, manifest, page_index=index, keep_going=True, **options)
+                self.assertEqual(fail_fast.exception.failures[0][0], os.path.join(content, "blog", "index.md"), options)
+                self.assertEqual(
+                    [(entry["source"], entry["type"]) for entry in keep_going.exception.report()],
+                    [(os.path.join(content, "blog", "index.md"), "FileNotFoundError"), (os.path.join(content, "blog", "post", "index.md"), "FileNotFoundError")],
+                )
+                self.assertTrue(os.path.exists(os.path.join(docs, "index.html")))
+                self.assertEqual(manifest.orphans(), [])
+
+                # Listing pages under blog/ use the same template.
+                index.record("post.md", {"title": "Post", "path": "/blog/post/", "date": "2024-01-02", "tags": [], "words": 1, "hash": ""})
+                with redirect_stdout(io.StringIO()):
+                    with self.assertRaises(BuildError) as listings:
+                        generate_listing_pages("/", index, content, template, docs, manifest, section_url="/blog/")
+                self.assertEqual([source for source, error in listings.exception.failures], ["/blog/"])
+
+    def test_fail_fast_records_queued_writes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_site(temp_dir, {"a/index.md": "# A", "b/index.md": "# B", "c/index.md": "no title", "d/index.md": "# D"})
+            content = os.path.join(temp_dir, "content")
+            template = os.path.join(temp_dir, "template.html")
+            docs = os.path.join(temp_dir, "docs")
+            manifest = BuildManifest(os.path.join(temp_dir, "manifest.json"))
+            index = PageIndex()
+            with redirect_stdout(io.StringIO()):
+                with self.assertRaises(BuildError):
+                    generate_pages_in_dir("/", content, template, docs, manifest, io_queue_size=4, page_index=index)
+            # Every page on disk is recorded; the page after the failure was never rendered.
+            self.assertEqual(sorted(manifest.entries), [os.path.join(docs, "a", "index.html"), os.path.join(docs, "b", "index.html")])
+            self.assertEqual(len(index), 2)
+            self.assertFalse(os.path.exists(os.path.join(docs, "d", "index.html")))
+
+    def test_error_report(self):
+        error = pickle.loads(pickle.dumps(SourceError("Unmatched delimiter '*'.", 3, 4)))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "cache", "errors.json")
+            write_error_report(path, [("a.md", error), ("b.md", OSError("disk full"))])
+            with open(path, 'r') as report_file:
+                report = json.load(report_file)
+        self.assertEqual(report["failed"], 2)
+        self.assertEqual(report["errors"][0], {"source": "a.md", "line": 3, "column": 4, "type": "SourceError", "message": "Unmatched delimiter '*'."})
+        self.assertEqual(report["errors"][1]["line"], None)
+
+if __name__ == "__main__":
+    unittest.main()
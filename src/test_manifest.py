@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from manifest import BuildManifest, hash_file
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.temp_dir.name, "page.html")
+        with open(self.output, 'w') as output_file:
+            output_file.write("<p>Hi</p>")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_hash_file(self):
+        self.assertEqual(hash_file(self.output), hash_file(self.output))
+        self.assertEqual(len(hash_file(self.output)), 64)
+
+    def test_unrecorded_is_not_current(self):
+        manifest = BuildManifest(os.path.join(self.temp_dir.name, "manifest.json"))
+        self.assertFalse(manifest.is_current(self.output, {"source": "abc"}))
+
+    def test_round_trip(self):
+        path = os.path.join(self.temp_dir.name, "cache", "manifest.json")
+        manifest = BuildManifest(path)
+        manifest.record(self.output, {"source": "abc"})
+        manifest.save()
+
+        loaded = BuildManifest.load(path)
+        self.assertTrue(loaded.is_current(self.output, {"source": "abc"}))
+        self.assertFalse(loaded.is_current(self.output, {"source": "def"}))
+
+    def test_missing_output_is_not_current(self):
+        manifest = BuildManifest(os.path.join(self.temp_dir.name, "manifest.json"))
+        manifest.record(self.output, {"source": "abc"})
+        os.remove(self.output)
+        self.assertFalse(manifest.is_current(self.output, {"source": "abc"}))
+
+    def test_orphans(self):
+        manifest = BuildManifest("unused", {"docs/old.html": {}, "docs/kept.html": {}})
+        manifest.is_current("docs/kept.html", {})
+        self.assertEqual(manifest.orphans(), ["docs/old.html"])
+
+    def test_dependents(self):
+        manifest = BuildManifest("unused", {
+            "docs/index.html": {"templates": {"template.html": "a", "partials/footer.html": "b"}},
+            "docs/blog/index.html": {"templates": {"content/blog/template.html": "c", "partials/footer.html": "b"}},
+            "docs/index.css": {"size": 1, "mtime_ns": 2},
+        })
+        self.assertEqual(manifest.dependents(["./partials/footer.html"]), ["docs/blog/index.html", "docs/index.html"])
+        self.assertEqual(manifest.dependents(["content/blog/template.html"]), ["docs/blog/index.html"])
+        self.assertEqual(manifest.dependents(["static/index.css"]), [])
+
+    def test_rebase(self):
+        manifest = BuildManifest("unused", {"docs/index.html": {"a": 1}, "docs/blog/index.html": {}, "docsx/other.html": {}})
+        manifest.is_current("docs/index.html", {"a": 1})
+        manifest.rebase("docs/", "docs.staging")
+        self.assertEqual(sorted(manifest.entries), ["docs.staging/blog/index.html", "docs.staging/index.html", "docsx/other.html"])
+        self.assertEqual(manifest.seen, {"docs.staging/index.html"})
+
+    def test_load_missing(self):
+        manifest = BuildManifest.load(os.path.join(self.temp_dir.name, "nope.json"))
+        self.assertEqual(manifest.entries, {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from front_matter import SourceReader
+from page_index import PageIndex, page_entry, page_path
+
+def entry(path, date = None, tags = ()):
+    return {"title": path, "path": path, "date": date, "tags": list(tags), "words": 1, "hash": "x"}
+
+class TestPageIndex(unittest.TestCase):
+    def test_page_entry(self):
+        reader = SourceReader("---\ndate: 2024-01-02\ntags: a, b\n---\n# Hi there\n".splitlines(keepends=True))
+        reader.read_all()
+        result = page_entry(reader, "Hi there", "/blog/hi/")
+        self.assertEqual((result["date"], result["tags"], result["words"]), ("2024-01-02", ["a", "b"], 3))
+
+    def test_page_path(self):
+        self.assertEqual(page_path("/blog/tom/", "docs/blog/tom/index.html"), "/blog/tom/")
+        self.assertEqual(page_path("/blog/", "docs/blog/notes.html"), "/blog/notes.html")
+        self.assertIsNone(page_path(None, "docs/index.html"))
+
+    def test_newest_first_and_tags(self):
+        index = PageIndex()
+        index.record("a.md", entry("/a/", "2024-01-01", ["x"]))
+        index.record("b.md", entry("/b/", "2024-06-01", ["x", "y"]))
+        index.record("c.md", entry("/c/"))
+        self.assertEqual([page["path"] for page in index.newest_first()], ["/b/", "/a/", "/c/"])
+        self.assertEqual([page["path"] for page in index.newest_first("y")], ["/b/"])
+        self.assertEqual(index.tags(), ["x", "y"])
+
+    def test_newest_first_in_section(self):
+        index = PageIndex()
+        index.record("blog.md", entry("/blog/", "2025-01-01"))
+        index.record("a.md", entry("/blog/a/", "2024-01-01"))
+        index.record("b.md", entry("/blog/b/"))
+        index.record("c.md", entry("/contact/", "2024-06-01"))
+        self.assertEqual([page["path"] for page in index.newest_first(section="/blog/")], ["/blog/a/", "/blog/b/"])
+        index.forget("a.md")
+        self.assertEqual([page["path"] for page in index.newest_first(section="/blog/")], ["/blog/b/"])
+
+    def test_retain_and_round_trip(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "cache", "pages.json")
+            index = PageIndex(path)
+            index.record("a.md", entry("/a/"))
+            index.record("b.md", entry("/b/"))
+            index.retain(["b.md"])
+            index.save()
+            self.assertEqual(PageIndex.load(path).pages, {"b.md": entry("/b/")})
+
+if __name__ == "__main__":
+    unittest.main()
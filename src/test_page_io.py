@@ -0,0 +1,54 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from page_io import BackgroundWriter, prefetch
+
+class TestPageIO(unittest.TestCase):
+    def test_prefetch_in_order(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for i in range(10):
+                path = os.path.join(temp_dir, f"{i}.md")
+                with open(path, 'w') as page_file:
+                    page_file.write(f"# Page {i}")
+                paths.append(path)
+            results = [(path, read.result()) for path, read in prefetch(paths, depth=3)]
+            self.assertEqual(results, [(path, f"# Page {i}") for i, path in enumerate(paths)])
+
+    def test_prefetch_error_per_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            good = os.path.join(temp_dir, "good.md")
+            with open(good, 'w') as page_file:
+                page_file.write("# Good")
+            reads = list(prefetch([os.path.join(temp_dir, "missing.md"), good]))
+            with self.assertRaises(FileNotFoundError):
+                reads[0][1].result()
+            self.assertEqual(reads[1][1].result(), "# Good")
+
+    def test_writer_bounds_pending(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+        release = threading.Event()
+
+        def write(i):
+            with lock:
+                running.append(i)
+                peak.append(len(running))
+            release.wait(5)
+            with lock:
+                running.remove(i)
+            return i
+
+        with BackgroundWriter(max_pending=2, workers=4) as writer:
+            futures = [writer.submit(write, 0), writer.submit(write, 1)]
+            # A third submit has to wait for a slot, so start a thread to free them.
+            threading.Timer(0.05, release.set).start()
+            futures.append(writer.submit(write, 2))
+        self.assertEqual([future.result() for future in futures], [0, 1, 2])
+        self.assertLessEqual(max(peak), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import contextlib
+import gzip
+import io
+import os
+import tempfile
+import unittest
+
+from manifest import BuildManifest
+from precompress import compress_outputs
+from main import remove_orphans
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.temp_dir.name, "docs")
+        os.makedirs(os.path.join(self.public, "blog"))
+        self.write("index.html", "<p>home</p>" * 200)
+        self.write("blog/index.html", "<p>small</p>")
+        self.write("index.css", "body { margin: 0; }\n" * 100)
+        self.write("tom.png", "png" * 1000)
+        self.manifest = BuildManifest(os.path.join(self.temp_dir.name, "manifest.json"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, path, text):
+        with open(os.path.join(self.public, path), 'w') as file:
+            file.write(text)
+
+    def compress(self, deleted = ()):
+        # Every file written by setUp counts as produced by this build, except deleted ones.
+        self.manifest.seen = set()
+        for dir_path, dir_names, file_names in os.walk(self.public):
+            for file_name in file_names:
+                path = os.path.normpath(os.path.join(dir_path, file_name))
+                if (not file_name.endswith((".gz", ".br"))) and (path not in deleted):
+                    self.manifest.seen.add(path)
+        return compress_outputs(self.public, self.manifest, min_size=1024)
+
+    def test_compresses_large_text_files(self):
+        self.assertEqual(self.compress(), (2, 0))
+        with gzip.open(os.path.join(self.public, "index.html.gz"), 'rt') as file:
+            self.assertEqual(file.read(), "<p>home</p>" * 200)
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "index.html.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "tom.png.gz")))
+
+    def test_only_changed_files_recompressed(self):
+        self.compress()
+        self.assertEqual(self.compress(), (0, 2))
+        self.write("index.html", "<p>changed</p>" * 200)
+        self.assertEqual(self.compress(), (1, 1))
+
+    def test_existing_siblings_kept_with_fresh_manifest(self):
+        self.compress()
+        self.manifest = BuildManifest(self.manifest.path)
+        self.assertEqual(self.compress(), (0, 2))
+
+    def test_shrunk_file_sibling_is_orphan(self):
+        self.compress()
+        self.write("index.html", "<p>tiny</p>")
+        self.compress()
+        self.assertEqual(self.manifest.orphans(), [os.path.join(self.public, "index.html.gz")])
+
+    def test_deleted_page_siblings_removed(self):
+        self.compress()
+        deleted = os.path.normpath(os.path.join(self.public, "index.html"))
+        self.manifest.record(deleted, {})
+        # The page's source was deleted: its output is still on disk until orphans are removed.
+        self.assertEqual(self.compress(deleted=[deleted]), (0, 1))
+        with contextlib.redirect_stdout(io.StringIO()):
+            remove_orphans(self.manifest)
+        self.assertEqual(sorted(os.listdir(self.public)), ["blog", "index.css", "index.css.gz", "tom.png"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from main import generate_page
+from profiler import BuildProfiler
+from template import Template
+
+class TestProfiler(unittest.TestCase):
+    def test_stage_and_timed(self):
+        profiler = BuildProfiler()
+        with profiler.stage("page", "a.md"):
+            pass
+        double = profiler.timed("inline parsing", lambda x: x * 2)
+        self.assertEqual(double(2), 4)
+        double(3)
+
+        self.assertEqual(profiler.counts, {"page": 1, "inline parsing": 2})
+        self.assertIn("a.md", profiler.page_times)
+        self.assertEqual(len(profiler.events), 1)
+
+    def test_merge(self):
+        worker = BuildProfiler()
+        with worker.stage("page", "b.md"):
+            pass
+        worker.bytes_read = 10
+        profiler = BuildProfiler()
+        with profiler.stage("page", "a.md"):
+            pass
+        profiler.merge(worker.to_dict())
+
+        self.assertEqual(profiler.counts["page"], 2)
+        self.assertEqual(sorted(profiler.page_times), ["a.md", "b.md"])
+        self.assertEqual(profiler.bytes_read, 10)
+
+    def test_report_lists_slowest_pages(self):
+        profiler = BuildProfiler()
+        profiler.page_times = {"fast.md": 0.001, "slow.md": 0.5, "medium.md": 0.01}
+        profiler.add("page", 0.511, 3)
+        report = profiler.report(top=2)
+        self.assertIn("slow.md", report)
+        self.assertIn("medium.md", report)
+        self.assertNotIn("fast.md", report)
+
+    def test_write_trace(self):
+        profiler = BuildProfiler()
+        with profiler.stage("page", "a.md"):
+            pass
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "trace.json")
+            profiler.write_trace(path)
+            with open(path) as trace_file:
+                trace = json.load(trace_file)
+        self.assertEqual(trace["traceEvents"][0]["name"], "page")
+        self.assertEqual(trace["traceEvents"][0]["ph"], "X")
+        self.assertEqual(trace["traceEvents"][0]["args"], {"page": "a.md"})
+
+    def test_stage_totals_within_page_total(self):
+        markdown = "# Title\n\n" + "\n\n".join(f"Paragraph {i} with *emphasis*, `code` and a [link](/x/)." for i in range(300))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source_path = os.path.join(temp_dir, "index.md")
+            with open(source_path, 'w') as file:
+                file.write(markdown)
+            profiler = BuildProfiler()
+            with redirect_stdout(io.StringIO()):
+                generate_page("/", source_path, Template("<title>{{ Title }}</title>{{ Content }}"), os.path.join(temp_dir, "index.html"), profiler=profiler)
+        # Parsing happens while the lazily parsed page is written; it must not count as serialization too.
+        page = profiler.totals["page"]
+        for stages in [
+            ("extract_title", "parsing", "serialization", "write"),
+            ("extract_title", "block splitting", "block parsing", "inline parsing", "node construction", "serialization", "write"),
+        ]:
+            self.assertLessEqual(sum(profiler.totals[stage] for stage in stages), page, stages)
+        self.assertGreater(profiler.totals["parsing"], 0.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+from render_cache import RenderCache
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "cache", "render.sqlite")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        cache = RenderCache(self.path)
+        key = cache.key("# Hi", "split", "/")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "Hi", "<div><h1>Hi</h1></div>", ["/", "/images/a.png"])
+        cache.close()
+
+        cache = RenderCache(self.path)
+        self.assertEqual(cache.get(key), ("Hi", "<div><h1>Hi</h1></div>", ["/", "/images/a.png"]))
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        cache.close()
+
+    def test_key_depends_on_options(self):
+        cache = RenderCache(self.path)
+        self.assertNotEqual(cache.key("# Hi", "split", "/"), cache.key("# Hi", "split", "/base/"))
+        self.assertNotEqual(cache.key("# Hi", "split", "/"), cache.key("# Ho", "split", "/"))
+        cache.close()
+
+    def test_evict_least_recently_used(self):
+        cache = RenderCache(self.path, max_bytes=25)
+        cache.put("old", "Old", "<p>0123456789</p>")
+        cache.put("new", "New", "<p>0123456789</p>")
+        cache.get("new")
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNone(cache.get("old"))
+        self.assertIsNotNone(cache.get("new"))
+        cache.close()
+
+    def test_old_schema_dropped(self):
+        cache = RenderCache(self.path)
+        cache.connection.execute("PRAGMA user_version = 1")
+        cache.put("key", "Title", "<p>x</p>")
+        cache.close()
+        cache = RenderCache(self.path)
+        self.assertIsNone(cache.get("key"))
+        cache.close()
+
+    def test_clear(self):
+        cache = RenderCache(self.path)
+        cache.put("key", "Title", "<p>x</p>")
+        cache.clear()
+        self.assertEqual(cache.size(), 0)
+        cache.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from textnode import TextNode, TextType
+from split_nodes import text_to_textnodes
+from scan_inline import scan_inline
+from source_error import SourceError
+from text_node_to_html_node import text_node_to_html_node
+
+class TestScanInline(unittest.TestCase):
+    def test_matches_text_to_textnodes(self):
+        texts = [
+            "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)",
+            "No markup at all.",
+            "*star italic* then ![a](u) and ![a](u) again",
+            "****",
+            "[](https://empty.link)",
+            "Brackets [without] a (url) and a lone ! mark",
+        ]
+        for text in texts:
+            self.assertEqual(scan_inline(text), text_to_textnodes(text))
+
+    def test_bold_inside_link(self):
+        nodes = scan_inline("[**Bold** link](https://boot.dev)")
+        self.assertEqual(
+            nodes,
+            [
+                TextNode("Bold link", TextType.LINK, "https://boot.dev", children=[
+                    TextNode("Bold", TextType.BOLD),
+                    TextNode(" link", TextType.PLAIN),
+                ]),
+            ],
+        )
+        self.assertEqual(
+            text_node_to_html_node(nodes[0]).to_html(),
+            '<a href="https://boot.dev"><b>Bold</b> link</a>',
+        )
+
+    def test_italic_inside_bold(self):
+        nodes = scan_inline("**bold _and italic_**")
+        self.assertEqual(
+            [text_node_to_html_node(node).to_html() for node in nodes],
+            ["<b>bold <i>and italic</i></b>"],
+        )
+
+    def test_code_is_literal(self):
+        self.assertEqual(
+            scan_inline("`a **b** _c_`"),
+            [TextNode("a **b** _c_", TextType.CODE)],
+        )
+
+    def test_unmatched_delimiter(self):
+        for text in ["Hello **world", "`code", "_oops"]:
+            with self.assertRaises(ValueError):
+                scan_inline(text)
+
+    def test_unmatched_delimiter_column(self):
+        # Inside link text too, columns count from the start of the whole text.
+        for text, column in [("Hello **world", 7), ("a [b `c](u)", 6)]:
+            with self.assertRaises(SourceError) as context:
+                scan_inline(text)
+            self.assertEqual(context.exception.column, column)
+
+if __name__ == "__main__":
+    unittest.main()
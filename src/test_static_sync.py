@@ -0,0 +1,75 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from manifest import BuildManifest
+from static_sync import sync_dir, place_file
+
+class TestStaticSync(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.temp_dir.name, "static")
+        self.public = os.path.join(self.temp_dir.name, "docs")
+        os.makedirs(os.path.join(self.static, "images"))
+        os.makedirs(self.public)
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+        self.manifest = BuildManifest(os.path.join(self.temp_dir.name, "manifest.json"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, path, text):
+        with open(path, 'w') as file:
+            file.write(text)
+
+    def sync(self, **kwargs):
+        self.manifest.seen = set()
+        with contextlib.redirect_stdout(io.StringIO()):
+            return sync_dir(self.static, self.public, self.manifest, **kwargs)
+
+    def test_copies_then_skips(self):
+        self.assertEqual(self.sync(), (2, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "images", "a.png")))
+        self.assertEqual(self.sync(), (0, 2))
+
+    def test_copies_changed_file(self):
+        self.sync()
+        self.write(os.path.join(self.static, "index.css"), "body { color: red; }")
+        self.assertEqual(self.sync(), (1, 1))
+        with open(os.path.join(self.public, "index.css")) as file:
+            self.assertEqual(file.read(), "body { color: red; }")
+
+    def test_deleted_file_is_orphan(self):
+        self.sync()
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        self.sync()
+        self.assertEqual(self.manifest.orphans(), [os.path.join(self.public, "images", "a.png")])
+
+    def test_existing_copy_kept_with_fresh_manifest(self):
+        self.sync()
+        self.manifest = BuildManifest(self.manifest.path)
+        self.assertEqual(self.sync(), (0, 2))
+        self.assertEqual(len(self.manifest.entries), 2)
+
+    def test_hash_mode(self):
+        self.assertEqual(self.sync(use_hash=True), (2, 0))
+        self.assertEqual(self.sync(use_hash=True), (0, 2))
+
+    def test_hardlink(self):
+        self.sync(method="hardlink")
+        self.assertTrue(os.path.samefile(os.path.join(self.static, "index.css"), os.path.join(self.public, "index.css")))
+
+    def test_place_file_replaces_link(self):
+        source = os.path.join(self.static, "index.css")
+        dest = os.path.join(self.public, "index.css")
+        place_file(source, dest, "hardlink")
+        other = os.path.join(self.static, "images", "a.png")
+        place_file(other, dest, "copy")
+        with open(source) as file:
+            self.assertEqual(file.read(), "body {}")
+
+if __name__ == "__main__":
+    unittest.main()
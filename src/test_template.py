@@ -0,0 +1,88 @@
+import io
+import os
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import Template, TemplateSet, apply_base_path
+
+def write_files(root, files):
+    for path, text in files.items():
+        path = os.path.join(root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(text)
+
+class TestTemplate(unittest.TestCase):
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(
+            template.render(Title="Hi", Content="<p>There</p>"),
+            "<title>Hi</title><article><p>There</p></article>",
+        )
+
+    def test_base_path_applies_to_template_only(self):
+        template = Template('<link href="/index.css" />{{ Content }}', base_path="/site/")
+        html = template.render(Content='<code>href="/literal"</code>')
+        self.assertEqual(html, '<link href="/site/index.css" /><code>href="/literal"</code>')
+
+    def test_missing_slot_left_as_written(self):
+        template = Template("<h1>{{ Title }}</h1>")
+        self.assertEqual(template.render(), "<h1>{{ Title }}</h1>")
+
+    def test_no_slots(self):
+        template = Template("<p>static</p>")
+        self.assertEqual(template.render(Title="unused"), "<p>static</p>")
+
+    def test_write_streams_nodes(self):
+        template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        stream = io.StringIO()
+        template.write(stream, Title="Hi", Content=ParentNode("div", [LeafNode("p", "There")]))
+        self.assertEqual(stream.getvalue(), "<title>Hi</title><article><div><p>There</p></div></article>")
+
+    def test_apply_base_path(self):
+        self.assertEqual(
+            apply_base_path('<img src="/a.png" /><a href="https://x.com/">x</a>', "/base/"),
+            '<img src="/base/a.png" /><a href="https://x.com/">x</a>',
+        )
+
+    def test_include_partials(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_files(temp_dir, {
+                "template.html": "{{ include partials/head.html }}<body>{{ Content }}</body>",
+                "partials/head.html": '<title>{{ Title }}</title>{{ include nav.html }}',
+                "partials/nav.html": '<a href="/">Home</a>',
+            })
+            template = Template.from_file(os.path.join(temp_dir, "template.html"), "/site/")
+            self.assertEqual(template.render(Title="Hi", Content="x"), '<title>Hi</title><a href="/site/">Home</a><body>x</body>')
+            self.assertEqual(
+                [os.path.relpath(path, temp_dir) for path in template.dependencies],
+                ["template.html", os.path.join("partials", "head.html"), os.path.join("partials", "nav.html")],
+            )
+
+    def test_include_cycle(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_files(temp_dir, {"a.html": "{{ include b.html }}", "b.html": "{{ include a.html }}"})
+            with self.assertRaises(ValueError):
+                Template.from_file(os.path.join(temp_dir, "a.html"))
+
+    def test_template_set_picks_nearest(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_files(temp_dir, {
+                "template.html": "root {{ Content }}",
+                "content/index.md": "# Home",
+                "content/blog/template.html": "blog {{ Content }}",
+                "content/blog/tom/index.md": "# Tom",
+                "content/blog/index.md": "# Blog",
+            })
+            content = os.path.join(temp_dir, "content")
+            templates = TemplateSet(os.path.join(temp_dir, "template.html"), "/", content)
+            self.assertEqual(templates.template_for(os.path.join(content, "index.md")).render(Content="x"), "root x")
+            self.assertEqual(templates.template_for(os.path.join(content, "blog", "tom", "index.md")).render(Content="x"), "blog x")
+            blog = templates.template_for(os.path.join(content, "blog", "index.md"))
+            self.assertEqual(len(templates.templates), 2)
+            self.assertEqual(list(templates.dependency_hashes(blog)), [os.path.join(content, "blog", "template.html")])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,8 +3,9 @@ import unittest
 from textnode import TextNode, TextType
 from text_node_to_html_node import text_node_to_html_node
 from htmlnode import LeafNode, NonClosingLeafNode
-from split_nodes import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
-from extract_markdown import extract_markdown_images, extract_markdown_links
+from split_nodes import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes, find_unmatched_delimiter
+from source_error import SourceError
+from extract_markdown import extract_markdown_images, extract_markdown_links, iter_markdown_images, iter_markdown_links
 
 class TestTextNode(unittest.TestCase):
     def test_eq(self):
@@ -31,6 +32,11 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("Default test", TextType.PLAIN, None)
         self.assertEqual(node1, node2)
         
+    def test_slots(self):
+        node = TextNode("Compact", TextType.PLAIN)
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertFalse(hasattr(text_node_to_html_node(node), "__dict__"))
+
     def test_text_to_html(self):
         node = TextNode("This is a text node", TextType.PLAIN)
         html_node = text_node_to_html_node(node)
@@ -150,6 +156,13 @@ class TestTextNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             split_nodes_delimiter(nodes, delimiter, TextType.ITALIC)
 
+    def test_unmatched_delimiter_column(self):
+        self.assertEqual(find_unmatched_delimiter("**a** and *b* then _c"), ("_", 20))
+        self.assertIsNone(find_unmatched_delimiter("**a** *b*"))
+        with self.assertRaises(SourceError) as context:
+            text_to_textnodes("`x` and **bold")
+        self.assertEqual(context.exception.column, 9)
+
     def text_extract_markdown_images(self):
         text = "This is text with a ![rick roll](https://i.imgur.com/aKaOqIh.gif) and ![obi wan](https://i.imgur.com/fJRm4Vk.jpeg)"
         expected_splits = [("rick roll", "https://i.imgur.com/aKaOqIh.gif"), ("obi wan", "https://i.imgur.com/fJRm4Vk.jpeg")]
@@ -184,6 +197,19 @@ class TestTextNode(unittest.TestCase):
         image_splits = extract_markdown_images(text)
         self.assertEqual(image_splits, expected_image_splits)
 
+    def test_iter_markdown_spans(self):
+        text = "A [link](https://boot.dev) and ![image](cat.png)"
+        links = [(match.span(), match.groups()) for match in iter_markdown_links(text)]
+        self.assertEqual(links, [((2, 26), ("link", "https://boot.dev"))])
+        images = [(match.span(), match.groups()) for match in iter_markdown_images(text)]
+        self.assertEqual(images, [((31, 48), ("image", "cat.png"))])
+
+    def test_split_nodes_link_repeated(self):
+        text = "[a](x) then [a](x) again"
+        expected_splits = [TextNode("a", TextType.LINK, "x"), TextNode(" then ", TextType.PLAIN), TextNode("a", TextType.LINK, "x"), TextNode(" again", TextType.PLAIN)]
+        splits = split_nodes_link([TextNode(text, TextType.PLAIN)])
+        self.assertEqual(splits, expected_splits)
+
     def test_split_nodes_image(self):
         text = "This is text with a ![rick roll](https://i.imgur.com/aKaOqIh.gif) and ![obi wan](https://i.imgur.com/fJRm4Vk.jpeg)"
         expected_splits =  [TextNode("This is text with a ", TextType.PLAIN, None), TextNode('rick roll', TextType.IMAGE, "https://i.imgur.com/aKaOqIh.gif"), TextNode(" and ", TextType.PLAIN, None), TextNode("obi wan", TextType.IMAGE, "https://i.imgur.com/fJRm4Vk.jpeg")]
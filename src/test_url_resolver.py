@@ -0,0 +1,51 @@
+import unittest
+
+from url_resolver import UrlResolver, depends_on_page, page_url
+
+class TestUrlResolver(unittest.TestCase):
+    def test_root_relative_gets_base_path(self):
+        resolver = UrlResolver("/site/")
+        self.assertEqual(resolver.resolve("/blog/tom"), "/site/blog/tom")
+        self.assertEqual(resolver.resolve("/"), "/site/")
+
+    def test_external_and_fragment_unchanged(self):
+        resolver = UrlResolver("/site/")
+        for url in ("https://www.boot.dev", "//cdn.example.com/a.png", "mailto:me@example.com", "#top"):
+            self.assertEqual(resolver.resolve(url, "/blog/"), url)
+
+    def test_relative_resolved_against_page(self):
+        resolver = UrlResolver("/site/")
+        self.assertEqual(resolver.resolve("../majesty/", "/blog/tom/"), "/site/blog/majesty/")
+        self.assertEqual(resolver.resolve("cover.png", "/blog/tom/"), "/site/blog/tom/cover.png")
+        self.assertEqual(resolver.resolve("../../..", "/blog/tom/"), "/site/")
+
+    def test_relative_without_page_stays_relative(self):
+        self.assertEqual(UrlResolver("/site/").resolve("next.md"), "next.html")
+
+    def test_markdown_links_map_to_html(self):
+        resolver = UrlResolver("/")
+        self.assertEqual(resolver.resolve("/blog/tom/index.md#intro", "/"), "/blog/tom/index.html#intro")
+        self.assertEqual(resolver.resolve("notes.md?v=2", "/blog/"), "/blog/notes.html?v=2")
+
+    def test_lookup_table_shared_between_pages(self):
+        resolver = UrlResolver("/site/")
+        resolver.for_page("/a/").resolve("/index.css")
+        resolver.for_page("/a/").resolve("/index.css")
+        resolver.for_page("/b/").resolve("x.md")
+        self.assertEqual(len(resolver.resolved), 2)
+
+    def test_key_for_depends_only_on_page_relative_urls(self):
+        resolver = UrlResolver("/site/")
+        a, b = resolver.for_page("/a/"), resolver.for_page("/b/")
+        self.assertEqual(a.key_for("[Home](/) and ![logo](https://x.org/l.png)"), b.key_for("[Home](/)"))
+        self.assertNotEqual(a.key_for("[Next](../next/)"), b.key_for("[Next](../next/)"))
+        self.assertNotEqual(a.key_for("[Tom](/blog/tom.md)"), b.key_for("[Tom](/blog/tom.md)"))
+        self.assertFalse(depends_on_page("#top"))
+        self.assertTrue(depends_on_page("images/tom.png"))
+
+    def test_page_url(self):
+        self.assertEqual(page_url("docs/index.html", "docs/"), "/")
+        self.assertEqual(page_url("docs/blog/tom/index.html", "docs/"), "/blog/tom/")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+
+from watch import InotifyWatcher, PollingWatcher, ReloadBroadcaster, SiteBuilder
+
+def write_files(files):
+    for path, text in files.items():
+        directory = os.path.dirname(path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(text)
+
+def read_tree(root) -> dict:
+    tree = {}
+    for dir_path, dir_names, file_names in os.walk(root):
+        for file_name in file_names:
+            path = os.path.join(dir_path, file_name)
+            with open(path, 'r') as file:
+                tree[os.path.relpath(path, root)] = file.read()
+    return tree
+
+class TestWatch(unittest.TestCase):
+    def test_polling_watcher(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            page = os.path.join(temp_dir, "index.md")
+            with open(page, 'w') as file:
+                file.write("# Before")
+            watcher = PollingWatcher([temp_dir], interval=0.01)
+
+            with open(page, 'w') as file:
+                file.write("# After, and longer")
+            new_page = os.path.join(temp_dir, "new.md")
+            with open(new_page, 'w') as file:
+                file.write("# New")
+            self.assertEqual(watcher.wait(), {os.path.normpath(page), os.path.normpath(new_page)})
+
+            os.remove(new_page)
+            self.assertEqual(watcher.wait(), {os.path.normpath(new_page)})
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_inotify_watcher_directory_rename(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            old = os.path.join(temp_dir, "blog")
+            new = os.path.join(temp_dir, "posts")
+            os.makedirs(os.path.join(old, "tom"))
+            with open(os.path.join(old, "tom", "index.md"), 'w') as file:
+                file.write("# Tom")
+            watcher = InotifyWatcher([temp_dir])
+            try:
+                os.rename(old, new)
+                self.assertEqual(watcher.wait(), {os.path.relpath(old), os.path.relpath(os.path.join(new, "tom", "index.md"))})
+
+                # The moved directory is watched under its new name.
+                os.remove(os.path.join(new, "tom", "index.md"))
+                self.assertEqual(watcher.wait(), {os.path.relpath(os.path.join(new, "tom", "index.md"))})
+
+                os.rmdir(os.path.join(new, "tom"))
+                self.assertEqual(watcher.wait(), {os.path.relpath(os.path.join(new, "tom"))})
+            finally:
+                watcher.close()
+
+    def test_reload_broadcaster(self):
+        broadcaster = ReloadBroadcaster()
+        self.assertEqual(broadcaster.wait(0, timeout=0.01), 0)
+        threading.Timer(0.01, broadcaster.notify).start()
+        self.assertEqual(broadcaster.wait(0, timeout=5), 1)
+
+class TestSiteBuilder(unittest.TestCase):
+    def setUp(self):
+        # SiteBuilder works on the paths in main.py, relative to the site root.
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        write_files({
+            "template.html": "{{ include partials/nav.html }}<title>{{ Title }}</title><body>{{ Content }}</body>",
+            "partials/nav.html": "<nav>v1</nav>",
+            "content/index.md": "# Home\n\nWelcome",
+            "content/blog/post.md": "# Post\n\nText",
+            "content/notes/template.html": "notes {{ Content }}",
+            "content/notes/a.md": "# A\n\nNote",
+            "static/style.css": "body {}",
+        })
+        self.builder = SiteBuilder("/")
+        with redirect_stdout(io.StringIO()):
+            self.builder.build_all()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def rebuild(self, files = None, removed = (), reported = ()) -> set:
+        """
+        Writes files, removes removed, rebuilds and returns the outputs (relative
+        to docs/) that were added, changed or removed.
+
+        :param reported: Other paths to report as changed, as a watcher would.
+        """
+        files = files or {}
+        before = read_tree("docs")
+        write_files(files)
+        for path in removed:
+            os.remove(path)
+        changed = {os.path.normpath(path) for path in list(files) + list(removed) + list(reported)}
+        with redirect_stdout(io.StringIO()):
+            self.builder.rebuild(changed)
+        after = read_tree("docs")
+        return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+    def test_build_all(self):
+        self.assertEqual(
+            sorted(read_tree("docs")),
+            [os.path.join("blog", "post.html"), "index.html", os.path.join("notes", "a.html"), "style.css"],
+        )
+
+    def test_page_edit(self):
+        self.assertEqual(self.rebuild({"content/index.md": "# Home\n\nWelcome back"}), {"index.html"})
+        self.assertIn("Welcome back", read_tree("docs")["index.html"])
+
+    def test_page_deletion(self):
+        self.assertEqual(self.rebuild(removed=["content/blog/post.md"]), {os.path.join("blog", "post.html")})
+        self.assertFalse(os.path.exists(os.path.join("docs", "blog")))
+        self.assertNotIn(os.path.join("docs", "blog", "post.html"), self.builder.manifest.entries)
+        self.assertNotIn(os.path.join("content", "blog", "post.md"), self.builder.page_index.pages)
+
+    def test_directory_rename(self):
+        os.rename(os.path.join("content", "blog"), os.path.join("content", "posts"))
+        changed = self.rebuild(reported=[os.path.join("content", "blog"), os.path.join("content", "posts", "post.md")])
+        self.assertEqual(changed, {os.path.join("blog", "post.html"), os.path.join("posts", "post.html")})
+        self.assertFalse(os.path.exists(os.path.join("docs", "blog")))
+
+    def test_static_add_and_remove(self):
+        self.assertEqual(self.rebuild({"static/extra.css": "p {}"}), {"extra.css"})
+        # Pages are not synced from static/, so they must not be removed as orphans.
+        self.assertEqual(self.rebuild(removed=["static/style.css"]), {"style.css"})
+        self.assertEqual(
+            sorted(read_tree("docs")),
+            [os.path.join("blog", "post.html"), "extra.css", "index.html", os.path.join("notes", "a.html")],
+        )
+
+    def test_template_dependents(self):
+        changed = self.rebuild({"template.html": "{{ include partials/nav.html }}<h1>{{ Title }}</h1>{{ Content }}"})
+        self.assertEqual(changed, {"index.html", os.path.join("blog", "post.html")})
+
+    def test_partial_dependents(self):
+        changed = self.rebuild({"partials/nav.html": "<nav>v2</nav>"})
+        self.assertEqual(changed, {"index.html", os.path.join("blog", "post.html")})
+        self.assertIn("<nav>v2</nav>", read_tree("docs")["index.html"])
+
+    def test_added_content_template(self):
+        changed = self.rebuild({"content/blog/template.html": "blog {{ Content }}"})
+        self.assertEqual(changed, {os.path.join("blog", "post.html")})
+        self.assertTrue(read_tree("docs")[os.path.join("blog", "post.html")].startswith("blog "))
+
+if __name__ == "__main__":
+    unittest.main()
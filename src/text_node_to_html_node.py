@@ -1,10 +1,30 @@
 from textnode import TextNode, TextType
-from htmlnode import LeafNode, NonClosingLeafNode
+from htmlnode import LeafNode, NonClosingLeafNode, ParentNode
 
-def text_node_to_html_node(text_node: TextNode):
+TAGS = {
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.LINK: "a",
+}
+
+def text_node_to_html_node(text_node: TextNode, resolve_url = None):
     """
     Convert a TextNode to an HTML LeafNode.
+    A TextNode with nested children becomes a ParentNode instead.
+
+    :param resolve_url: An optional function mapping each link and image URL to the one written to the href or src.
     """
+    if text_node.children is not None:
+        if text_node.text_type not in TAGS:
+            raise ValueError(f"TextNode of type {text_node.text_type} cannot have children.")
+        props = None
+        if text_node.text_type == TextType.LINK:
+            if ((text_node.url is None) or (text_node.url == "")):
+                raise ValueError("TextNode of type LINK must have a URL.")
+            props = {"href": text_node.url if resolve_url is None else resolve_url(text_node.url)}
+        children = [text_node_to_html_node(child, resolve_url) for child in text_node.children]
+        return ParentNode(tag=TAGS[text_node.text_type], children=children, props=props)
+
     if ((text_node.text is None) or (text_node.text == "")):
         raise ValueError("TextNode must have text to convert to HTMLNode.")
     
@@ -20,8 +40,10 @@ def text_node_to_html_node(text_node: TextNode):
         case TextType.LINK:
             if ((text_node.url is None) or (text_node.url == "")):
                 raise ValueError("TextNode of type LINK must have a URL.")
-            return LeafNode(tag="a", value=text_node.text, props={"href": text_node.url})
+            url = text_node.url if resolve_url is None else resolve_url(text_node.url)
+            return LeafNode(tag="a", value=text_node.text, props={"href": url})
         case TextType.IMAGE:
             if ((text_node.url is None) or (text_node.url == "")):
                 raise ValueError("TextNode of type IMAGE must have a URL.")
-            return NonClosingLeafNode(tag="img", props={"src": text_node.url, "alt": text_node.text})
\ No newline at end of file
+            url = text_node.url if resolve_url is None else resolve_url(text_node.url)
+            return NonClosingLeafNode(tag="img", props={"src": url, "alt": text_node.text})
\ No newline at end of file
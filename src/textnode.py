@@ -9,20 +9,27 @@ class TextType(Enum):
     IMAGE = 32
 
 class TextNode:
-    def __init__(self, text, text_type=TextType.PLAIN, url=None):
+    __slots__ = ("text", "text_type", "url", "children")
+
+    def __init__(self, text, text_type=TextType.PLAIN, url=None, children=None):
         self.text = text
         self.text_type = text_type
         self.url = url
+        # Nested inline nodes (e.g. bold text inside a link). None for flat nodes.
+        self.children = children
 
     def __eq__(self, other) -> bool:
         return (
             self.text == other.text and
             self.text_type == other.text_type and
-            self.url == other.url
+            self.url == other.url and
+            self.children == other.children
         )
     
     def __repr__(self) -> str:
-        return f"TextNode({self.text}, {self.text_type}, {self.url})"
+        if self.children is None:
+            return f"TextNode({self.text}, {self.text_type}, {self.url})"
+        return f"TextNode({self.text}, {self.text_type}, {self.url}, {self.children})"
 
 def main():
     tm = TextNode("example", TextType.LINK, "http://example.com")
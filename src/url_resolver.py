@@ -0,0 +1,117 @@
+import os
+import re
+import posixpath
+from urllib.parse import urlsplit
+
+# The URL of every markdown link or image, nested or not: "](url)".
+MARKDOWN_URL_PATTERN = re.compile(r"\]\(([^\(\)]*)\)")
+
+def page_url(dest_path, public_path) -> str:
+    """
+    Returns the site URL of the directory holding an output page, e.g.
+    "/blog/tom/" for docs/blog/tom/index.html under docs/.
+    """
+    directory = os.path.relpath(os.path.dirname(dest_path), public_path).replace(os.sep, "/")
+    if directory == ".":
+        return "/"
+    return f"/{directory}/"
+
+def depends_on_page(url: str) -> bool:
+    """
+    Returns True if url may resolve differently on different pages of a site:
+    a relative URL, or (conservatively) any link to a .md file.
+    """
+    parts = urlsplit(url)
+    if (parts.scheme != "") or (parts.netloc != "") or (parts.path == ""):
+        return False
+    return (not parts.path.startswith("/")) or parts.path.endswith(".md")
+
+class UrlResolver:
+    """
+    Maps the URLs written in markdown links and images to the URLs of the built site:
+    - External URLs (with a scheme or host) and bare #fragments are left alone.
+    - Links to .md files point at the .html page generated from them.
+    - Relative URLs are resolved against the directory of the page they appear in.
+    - Root-relative URLs are served under base_path.
+    Results are kept in one lookup table for the whole build, since most pages
+    link to the same handful of targets.
+    """
+    def __init__(self, base_path = "/"):
+        self.base_path = base_path
+        self.resolved = {}
+
+    def for_page(self, page_url = None) -> "PageUrlResolver":
+        """
+        Returns a resolver for the URLs in one page.
+
+        :param page_url: The site URL of the page's directory, e.g. "/blog/tom/".
+            If None, relative URLs are left relative.
+        """
+        return PageUrlResolver(self, page_url)
+
+    def resolve(self, url: str, page_url = None) -> str:
+        lookup = (page_url, url)
+        resolved = self.resolved.get(lookup)
+        if resolved is None:
+            resolved = self.resolve_uncached(url, page_url)
+            self.resolved[lookup] = resolved
+        return resolved
+
+    def resolve_uncached(self, url: str, page_url = None) -> str:
+        parts = urlsplit(url)
+        if (parts.scheme != "") or (parts.netloc != "") or (parts.path == ""):
+            return url
+
+        path = parts.path
+        if path.endswith(".md"):
+            path = path[:-3] + ".html"
+        if not path.startswith("/"):
+            if page_url is None:
+                return self.rejoin(path, parts)
+            # normpath drops a trailing slash, which matters for directory URLs.
+            trailing = "/" if path.endswith("/") else ""
+            path = posixpath.normpath(posixpath.join(page_url, path))
+            if path != "/":
+                path += trailing
+        return self.rejoin(self.base_path + path[1:], parts)
+
+    def rejoin(self, path: str, parts) -> str:
+        if parts.query != "":
+            path += "?" + parts.query
+        if parts.fragment != "":
+            path += "#" + parts.fragment
+        return path
+
+    def __repr__(self) -> str:
+        return f"UrlResolver({self.base_path})"
+
+class PageUrlResolver:
+    """
+    A UrlResolver bound to one page. key identifies everything the resolved
+    URLs depend on, for use in cache keys.
+    """
+    __slots__ = ("site", "page_url")
+
+    def __init__(self, site: UrlResolver, page_url = None):
+        self.site = site
+        self.page_url = page_url
+
+    def resolve(self, url: str) -> str:
+        return self.site.resolve(url, self.page_url)
+
+    @property
+    def key(self) -> str:
+        return f"{self.site.base_path}\0{self.page_url}"
+
+    def key_for(self, text: str) -> str:
+        """
+        Returns the cache key for markdown text rendered on this page: key if any
+        URL in it depends on the page, otherwise one shared by every page of the site,
+        so boilerplate such as a footer is rendered once per site rather than per page.
+        """
+        if any(depends_on_page(url) for url in MARKDOWN_URL_PATTERN.findall(text)):
+            return self.key
+        return self.site.base_path
+
+    def __repr__(self) -> str:
+        return f"PageUrlResolver({self.site.base_path}, {self.page_url})"
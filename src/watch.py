@@ -0,0 +1,437 @@
+"""
+Watch mode: serves docs/ locally, rebuilds only what changed in content/, static/,
+the templates or their partials, and tells open browser tabs to reload.
+
+Usage: python3 src/watch.py [base_path] [--port 8888] [--poll] [--listings]
+"""
+import os
+import sys
+import time
+import struct
+import select
+import argparse
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from manifest import BuildManifest
+from template import TemplateSet, TEMPLATE_NAME
+from block_cache import BlockCache
+from markdown_to_html_node import INLINE_PARSERS
+from url_resolver import UrlResolver, page_url
+from page_index import PageIndex, PAGE_INDEX_PATH
+from listings import LISTING_SECTION
+from main import (
+    PUBLIC_PATH, STATIC_PATH, CONTENT_PATH, TEMPLATE_PATH, MANIFEST_PATH, BuildError,
+    copy_static_to_public, sync_static_to_public, remove_orphans,
+    generate_page, generate_pages_in_dir, generate_listing_pages, collect_pages, page_inputs,
+)
+
+RELOAD_PATH = "/__livereload"
+RELOAD_SCRIPT = f'<script>new EventSource("{RELOAD_PATH}").onmessage = function () {{ location.reload(); }};</script>'
+
+class PollingWatcher:
+    """
+    Detects changes by comparing (mtime, size) snapshots of every file under the watched paths.
+    """
+    def __init__(self, paths, interval = 0.25):
+        self.paths = paths
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self) -> dict:
+        snapshot = {}
+        for path in self.paths:
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                snapshot[os.path.normpath(path)] = (stat.st_mtime_ns, stat.st_size)
+                continue
+            for dir_path, dir_names, file_names in os.walk(path):
+                for file_name in file_names:
+                    file_path = os.path.join(dir_path, file_name)
+                    try:
+                        stat = os.stat(file_path)
+                    except FileNotFoundError:
+                        continue
+                    snapshot[os.path.normpath(file_path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self) -> set:
+        """
+        Blocks until something changes and returns the changed (or deleted) file paths.
+        """
+        while True:
+            time.sleep(self.interval)
+            snapshot = self.scan()
+            changed = {path for path in snapshot.keys() | self.snapshot.keys() if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if len(changed) > 0:
+                return changed
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """
+    Linux inotify watcher, called through ctypes so there is no extra dependency.
+    Directories are watched recursively; watching a file watches its directory.
+    """
+    # Masks from sys/inotify.h.
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_ISDIR = 0x40000000
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT_HEADER = struct.Struct("iIII")
+
+    # Editors often write a file in several steps; events this close together are batched.
+    SETTLE_SECONDS = 0.05
+
+    def __init__(self, paths):
+        import ctypes
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        self.files = set()
+        for path in paths:
+            if os.path.isfile(path):
+                self.files.add(os.path.normpath(path))
+                self.add_watch(os.path.dirname(os.path.abspath(path)) or ".", recursive=False)
+            else:
+                self.add_watch(path, recursive=True)
+
+    def add_watch(self, path, recursive = True):
+        watch = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if watch < 0:
+            raise OSError(f"Could not watch {path}")
+        self.directories[watch] = (path, recursive)
+        if recursive:
+            for entry in os.scandir(path):
+                if entry.is_dir():
+                    self.add_watch(entry.path)
+
+    def read_events(self) -> set:
+        changed = set()
+        data = os.read(self.fd, 1 << 16)
+        offset = 0
+        while offset < len(data):
+            watch, mask, cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if watch not in self.directories:
+                continue
+            directory, recursive = self.directories[watch]
+            path = os.path.normpath(os.path.join(directory, name))
+            if mask & self.IN_ISDIR:
+                if recursive and (mask & (self.IN_CREATE | self.IN_MOVED_TO)) and os.path.isdir(path):
+                    self.add_watch(path)
+                    # Files may have landed in the new directory before it was watched.
+                    for dir_path, _, file_names in os.walk(path):
+                        changed.update(os.path.relpath(os.path.join(dir_path, file_name)) for file_name in file_names)
+                elif recursive and (mask & (self.IN_DELETE | self.IN_MOVED_FROM)):
+                    # Its files are gone too, but get no events of their own (see SiteBuilder.rebuild).
+                    changed.add(os.path.relpath(path))
+                continue
+            path = os.path.relpath(path)
+            if recursive or (path in self.files):
+                changed.add(path)
+        return changed
+
+    def wait(self) -> set:
+        """
+        Blocks until something changes and returns the changed (or deleted) file paths,
+        and the paths of directories that were deleted or moved away.
+        """
+        changed = set()
+        while len(changed) == 0:
+            select.select([self.fd], [], [])
+            changed |= self.read_events()
+            while select.select([self.fd], [], [], self.SETTLE_SECONDS)[0]:
+                changed |= self.read_events()
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+def make_watcher(paths, polling = False):
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError) as error:
+            print(f"inotify unavailable ({error}); falling back to polling.")
+    return PollingWatcher(paths)
+
+class SiteBuilder:
+    """
+    Keeps the compiled templates and manifest between rebuilds, and maps changed
+    source files to the pages and assets they affect. A changed template or
+    partial only rebuilds the pages the manifest records as depending on it.
+
+    :param listing_page_size: If given, listing pages (see generate_listing_pages) with
+        this many entries are kept up to date as well.
+    """
+    def __init__(self, base_path, inline_parser = "split", listing_page_size = None, listing_section = LISTING_SECTION):
+        self.base_path = base_path
+        self.inline_parser = inline_parser
+        self.listing_page_size = listing_page_size
+        self.listing_section = listing_section
+        self.manifest = BuildManifest.load(MANIFEST_PATH)
+        self.page_index = PageIndex.load(PAGE_INDEX_PATH)
+        self.templates = None
+        # Most edits touch a block or two, so keep rendered blocks between rebuilds.
+        self.block_cache = BlockCache()
+        self.url_resolver = UrlResolver(base_path)
+
+    def build_all(self):
+        if os.path.isdir(PUBLIC_PATH):
+            sync_static_to_public(self.manifest)
+        else:
+            self.manifest = BuildManifest(MANIFEST_PATH)
+            copy_static_to_public(self.manifest)
+        self.load_template()
+        try:
+            generate_pages_in_dir(self.base_path, CONTENT_PATH, TEMPLATE_PATH, PUBLIC_PATH, self.manifest, inline_parser=self.inline_parser, block_cache=self.block_cache, url_resolver=self.url_resolver, page_index=self.page_index)
+        except BuildError as error:
+            print(error, file=sys.stderr)
+        self.update_listings()
+        remove_orphans(self.manifest)
+        self.save()
+
+    def update_listings(self) -> bool:
+        """
+        Rewrites the listing pages whose slice of the page index changed.
+        Returns True if any were written or removed.
+        """
+        if self.listing_page_size is None:
+            return False
+        before = len(self.manifest.entries)
+        try:
+            written, unchanged = generate_listing_pages(self.base_path, self.page_index, CONTENT_PATH, TEMPLATE_PATH, PUBLIC_PATH, self.manifest, self.url_resolver, self.listing_section, self.listing_page_size)
+        except BuildError as error:
+            print(error, file=sys.stderr)
+            return False
+        return (written > 0) or (len(self.manifest.entries) != before)
+
+    def save(self):
+        self.manifest.save()
+        self.page_index.save()
+
+    def load_template(self):
+        # Templates and partials are recompiled (and rehashed) on next use.
+        self.templates = TemplateSet(TEMPLATE_PATH, self.base_path, CONTENT_PATH)
+
+    def template_files(self) -> set:
+        """
+        Returns every template and partial the current pages were built with.
+        """
+        files = {os.path.normpath(TEMPLATE_PATH)}
+        for inputs in self.manifest.entries.values():
+            files.update(inputs.get("templates", ()))
+        return files
+
+    def dest_for(self, source) -> str:
+        relative = os.path.relpath(source, CONTENT_PATH)
+        return os.path.normpath(os.path.join(PUBLIC_PATH, relative[:-3] + ".html"))
+
+    def render(self, source, dest) -> bool:
+        """
+        Renders one page. Returns False if the output came out identical to the file on disk.
+        """
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        url_resolver = self.url_resolver.for_page(page_url(dest, PUBLIC_PATH))
+        template = self.templates.template_for(source)
+        links, written, entry = generate_page(self.base_path, source, template, dest, self.inline_parser, block_cache=self.block_cache, url_resolver=url_resolver)
+        self.page_index.record(source, entry)
+        self.manifest.record(dest, page_inputs(self.base_path, source, self.templates.dependency_hashes(template), self.inline_parser))
+        return written
+
+    def rebuild(self, changed: set) -> bool:
+        """
+        Rebuilds what the changed paths affect. Returns True if anything in docs/ changed.
+        A changed path that no longer exists and is not a page may be a directory that
+        was deleted or moved away; the pages recorded under it are removed.
+        """
+        content = os.path.normpath(CONTENT_PATH)
+        static = os.path.normpath(STATIC_PATH)
+        pages = {path for path in changed if path.startswith(content + os.sep) and path.endswith(".md")}
+        for path in changed:
+            if path.startswith(content + os.sep) and not path.endswith(".md") and not os.path.exists(path):
+                directory = path + os.sep
+                pages.update(source for source in self.page_index.pages if os.path.normpath(source).startswith(directory))
+        static_changed = any(path.startswith(static + os.sep) for path in changed)
+
+        template_files = self.template_files()
+        changed_templates = {path for path in changed if path in template_files}
+        # A template.html added to or removed from content/ changes which template its pages use.
+        added_templates = {
+            path for path in changed
+            if path.startswith(content + os.sep) and (os.path.basename(path) == TEMPLATE_NAME)
+        }
+        if (len(changed_templates) > 0) or (len(added_templates) > 0):
+            self.load_template()
+            sources = {dest: source for source, dest in collect_pages(CONTENT_PATH, PUBLIC_PATH)}
+            for dest in self.manifest.dependents(changed_templates):
+                if dest in sources:
+                    pages.add(sources[dest])
+            for path in added_templates:
+                directory = os.path.dirname(path) + os.sep
+                pages.update(source for source in sources.values() if source.startswith(directory))
+        if static_changed:
+            # Pages count as seen; static outputs the sync does not see were deleted from static/.
+            self.manifest.seen = {dest for dest, inputs in self.manifest.entries.items() if "templates" in inputs}
+            sync_static_to_public(self.manifest)
+            remove_orphans(self.manifest)
+
+        failures = []
+        pages_changed = False
+        for source in sorted(pages):
+            dest = self.dest_for(source)
+            if not os.path.exists(source):
+                if os.path.exists(dest):
+                    print(f"Removing {dest}.")
+                    os.remove(dest)
+                    try:
+                        os.removedirs(os.path.dirname(dest))
+                    except OSError:
+                        pass
+                self.manifest.forget(dest)
+                self.page_index.forget(source)
+                pages_changed = True
+                continue
+            try:
+                # An edit that renders to the same HTML (e.g. whitespace) needs no reload.
+                pages_changed = self.render(source, dest) or pages_changed
+            except Exception as error:
+                failures.append((source, error))
+        if len(failures) > 0:
+            print(BuildError(failures), file=sys.stderr)
+        listings_changed = self.update_listings()
+
+        self.save()
+        return pages_changed or static_changed or listings_changed
+
+class ReloadBroadcaster:
+    """
+    Counts rebuilds; every open event stream waits for the count to change.
+    """
+    def __init__(self):
+        self.version = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout) -> int:
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    """
+    Serves docs/ like http.server, plus a server-sent event stream at RELOAD_PATH.
+    HTML pages get the reload script injected as they are served; files on disk are untouched.
+    """
+    def __init__(self, *args, broadcaster = None, **kwargs):
+        self.broadcaster = broadcaster
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == RELOAD_PATH:
+            self.stream_reloads()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.endswith("/"):
+            path = os.path.join(path, "index.html")
+        if path.endswith(".html") and os.path.isfile(path):
+            self.send_html(path)
+            return
+        super().do_GET()
+
+    def send_html(self, path):
+        with open(path, 'rb') as html_file:
+            body = html_file.read()
+        marker = body.rfind(b"</body>")
+        script = RELOAD_SCRIPT.encode()
+        body = body + script if marker == -1 else body[:marker] + script + body[marker:]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_reloads(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        version = self.broadcaster.version
+        try:
+            while True:
+                new_version = self.broadcaster.wait(version, timeout=15)
+                if new_version == version:
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    self.wfile.write(b"data: reload\n\n")
+                    version = new_version
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        if self.path != RELOAD_PATH:
+            super().log_message(format, *args)
+
+def serve(port, broadcaster) -> ThreadingHTTPServer:
+    handler = partial(LiveReloadHandler, directory=PUBLIC_PATH, broadcaster=broadcaster)
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve docs/ and rebuild it as content/, static/ or template.html change.")
+    parser.add_argument("base_path", nargs="?", default="/", help="URL prefix the site is built for (default: /).")
+    parser.add_argument("--port", type=int, default=8888, help="Port to serve on (default: 8888).")
+    parser.add_argument("--poll", action="store_true", help="Poll for changes instead of using inotify.")
+    parser.add_argument("--inline-parser", choices=sorted(INLINE_PARSERS), default="split", help="Inline markdown parser (see main.py).")
+    parser.add_argument("--listings", action="store_true", help="Keep the generated listing pages up to date (see main.py).")
+    parser.add_argument("--listing-section", default=LISTING_SECTION, help=f"Site URL whose pages are listed (default: {LISTING_SECTION}).")
+    parser.add_argument("--listing-page-size", type=int, default=10, help="Entries per listing page (default: 10).")
+    args = parser.parse_args()
+
+    listing_page_size = args.listing_page_size if args.listings else None
+    builder = SiteBuilder(args.base_path, args.inline_parser, listing_page_size, args.listing_section)
+    builder.build_all()
+
+    broadcaster = ReloadBroadcaster()
+    server = serve(args.port, broadcaster)
+    # Partials outside content/ are watched as of when watching started; content/ is watched whole.
+    trees = tuple(os.path.normpath(path) + os.sep for path in (CONTENT_PATH, STATIC_PATH))
+    partials = {path for path in builder.template_files() if os.path.isfile(path) and not path.startswith(trees)}
+    watcher = make_watcher([CONTENT_PATH, STATIC_PATH, TEMPLATE_PATH] + sorted(partials - {os.path.normpath(TEMPLATE_PATH)}), args.poll)
+    print(f"Serving {PUBLIC_PATH} at http://localhost:{args.port}/ and watching for changes.")
+    try:
+        while True:
+            changed = watcher.wait()
+            start = time.perf_counter()
+            if builder.rebuild(changed):
+                broadcaster.notify()
+                print(f"Rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms.")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        server.shutdown()
+        builder.save()
+
+if __name__ == "__main__":
+    main()